@@ -1,5 +1,25 @@
+from datetime import time, timedelta
 from django.contrib import admin
-from .models import CustomUser, Product, UserAddress, Order, OrderItem
+from django.contrib.admin.views.main import IGNORED_PARAMS, PAGE_VAR
+from django.db.models import F, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import CustomUser, Product, UserAddress, Order, OrderItem, OutboxEmail
+from .sales import REVENUE_FIELD, sales_totals
+
+# Changelist filters the sales rollups can answer (the created_at date filter)
+ROLLUP_FILTERS = {'created_at__gte', 'created_at__lt'}
+
+
+def _filter_day(value):
+    """A created_at filter bound as a local day, if it falls on midnight"""
+    moment = parse_datetime(value)
+    if moment is None:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    moment = timezone.localtime(moment)
+    return moment.date() if moment.time() == time.min else None
 
 @admin.register(CustomUser)
 class CustomUserAdmin(admin.ModelAdmin):
@@ -25,19 +45,58 @@ class UserAddressAdmin(admin.ModelAdmin):
 class OrderItemInline(admin.TabularInline):  # ✅ Inline OrderItems
     model = OrderItem
     extra = 0
-    readonly_fields = ('product', 'quantity', 'price')
+    readonly_fields = ('product', 'quantity', 'price', 'backordered')
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ('id', 'user', 'address', 'total_price', 'is_paid', 'created_at')
-    list_filter = ('is_paid', 'created_at')
+    list_display = ('id', 'user', 'address', 'total_price', 'is_paid', 'stock_shortfall', 'created_at')
+    list_select_related = ('user', 'address')
+    list_filter = ('is_paid', 'stock_shortfall', 'created_at')
     search_fields = ('user__email', 'address__city')
     ordering = ('-created_at',)
     inlines = [OrderItemInline]  # ✅ Attach the inline here
 
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        context = getattr(response, 'context_data', None)
+        if context and 'cl' in context:
+            context['sales_totals'] = self.sales_totals(request, context['cl'])
+        return response
+
+    def sales_totals(self, request, cl):
+        """
+        Totals for the listed orders. Unfiltered or day-filtered lists read the
+        sales rollups; other filters and searches aggregate the order lines.
+        """
+        params = {k: v for k, v in request.GET.items() if k not in IGNORED_PARAMS and k != PAGE_VAR}
+        if set(params) <= ROLLUP_FILTERS:
+            days = {name: _filter_day(value) for name, value in params.items()}
+            if None not in days.values():
+                until = days.get('created_at__lt')  # exclusive
+                end = until - timedelta(days=1) if until else None
+                return {**sales_totals(days.get('created_at__gte'), end), 'from_rollups': True}
+
+        totals = OrderItem.objects.filter(order__in=cl.queryset.order_by().values('pk')).aggregate(
+            units=Sum('quantity'),
+            revenue=Sum(F('price') * F('quantity'), output_field=REVENUE_FIELD),
+        )
+        return {
+            'order_count': cl.result_count,
+            'units': totals['units'] or 0,
+            'revenue': totals['revenue'] or 0,
+        }
+
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
     list_display = ('order', 'product', 'quantity', 'price')
+    list_select_related = ('order__user', 'product')
     search_fields = ('order__id', 'product__name')
     list_filter = ('product',)
     ordering = ('order',)
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('to', 'subject')
+    ordering = ('-created_at',)
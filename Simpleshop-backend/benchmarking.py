@@ -0,0 +1,50 @@
+# api/benchmarking.py
+import statistics
+import time
+from contextlib import contextmanager
+from django.db import DEFAULT_DB_ALIAS
+from django.test.utils import setup_databases, teardown_databases
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(timings_ms):
+    timings = sorted(timings_ms)
+    return {
+        'count': len(timings),
+        'p50': statistics.median(timings) if timings else 0.0,
+        'p95': percentile(timings, 95),
+        'p99': percentile(timings, 99),
+    }
+
+
+def timed(fn, repeat):
+    """Run fn `repeat` times and return its latency summary in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    """
+    Point the default connection at a fresh test database for the block, as
+    manage.py test does, and destroy it afterwards. Benchmarks, stress runs
+    and the query checks seed and hammer tables: they never run against the
+    configured one.
+    """
+    old_config = setup_databases(
+        verbosity, interactive=False, aliases={DEFAULT_DB_ALIAS}, serialized_aliases=set(),
+    )
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity)
@@ -0,0 +1,90 @@
+# api/cart.py
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import CartItem, Product
+
+ADD = 'add'
+SET = 'set'
+REMOVE = 'remove'
+
+_TABLE = CartItem._meta.db_table
+
+
+def _upsert(rows, on_conflict):
+    """
+    One INSERT ... ON CONFLICT (user, product) DO UPDATE for all rows.
+    rows: [(user_id, product_id, quantity)]. SQLite >= 3.24 and PostgreSQL.
+    """
+    if not rows:
+        return
+    added_at = CartItem._meta.get_field('added_at').get_db_prep_value(timezone.now(), connection)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {_TABLE} (user_id, product_id, quantity, added_at) VALUES (%s, %s, %s, %s) "
+            f"ON CONFLICT (user_id, product_id) DO UPDATE SET quantity = {on_conflict}",
+            [(user_id, product_id, quantity, added_at) for user_id, product_id, quantity in rows],
+        )
+
+
+def _greatest():
+    return 'MAX' if connection.vendor == 'sqlite' else 'GREATEST'
+
+
+def fold_operations(operations):
+    """
+    Collapse an ordered list of {op, product_id, quantity} into one final
+    effect per product: ('add', n), ('set', n) or ('remove', None).
+    """
+    effects = {}
+    for operation in operations:
+        op, product_id, quantity = operation['op'], operation['product_id'], operation.get('quantity', 1)
+        current = effects.get(product_id)
+
+        if op == REMOVE or (op == SET and quantity == 0):
+            effects[product_id] = (REMOVE, None)
+        elif op == SET:
+            effects[product_id] = (SET, quantity)
+        elif current is None:
+            effects[product_id] = (ADD, quantity)
+        elif current[0] == REMOVE:
+            effects[product_id] = (SET, quantity)
+        else:
+            effects[product_id] = (current[0], current[1] + quantity)
+    return effects
+
+
+def missing_products(product_ids):
+    product_ids = set(product_ids)
+    existing = set(Product.objects.filter(id__in=product_ids).values_list('id', flat=True))
+    return sorted(product_ids - existing)
+
+
+def apply_cart_operations(user, operations):
+    """
+    Apply add/set/remove operations in one transaction with at most three
+    statements. Increments happen in SQL, so concurrent adds never lose updates.
+    """
+    effects = fold_operations(operations)
+    adds = [(user.id, pk, n) for pk, (op, n) in effects.items() if op == ADD and n > 0]
+    sets = [(user.id, pk, n) for pk, (op, n) in effects.items() if op == SET]
+    removes = [pk for pk, (op, _) in effects.items() if op == REMOVE]
+
+    with transaction.atomic():
+        _upsert(adds, f'{_TABLE}.quantity + excluded.quantity')
+        _upsert(sets, 'excluded.quantity')
+        if removes:
+            CartItem.objects.filter(user=user, product_id__in=removes).delete()
+
+
+def merge_cart(user, items):
+    """
+    Reconcile a client-side cart at login in one statement: each product ends
+    up with the larger of the stored and the local quantity.
+    """
+    quantities = {}
+    for item in items:
+        quantities[item['product_id']] = max(quantities.get(item['product_id'], 0), item['quantity'])
+    rows = [(user.id, pk, n) for pk, n in quantities.items() if n > 0]
+
+    with transaction.atomic():
+        _upsert(rows, f'{_greatest()}({_TABLE}.quantity, excluded.quantity)')
@@ -0,0 +1,85 @@
+# api/catalog_cache.py
+import hashlib
+import time
+from functools import wraps
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from .compression import ENCODINGS, encoded_variants, negotiate_encoding
+from .db_router import catalog_written, replica_may_be_stale
+from .renderers import ORJSONRenderer
+
+# The catalog version is bumped by the Product signals; every cached response
+# is keyed by it, so a bump invalidates all of them at once without a scan
+VERSION_KEY = 'catalog:version'
+CATALOG_CACHE_TIMEOUT = 60 * 60
+
+
+def catalog_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses an old version
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    cache.set(VERSION_KEY, time.time_ns(), None)
+    # The replica may lag behind this change; see replica_may_be_stale()
+    catalog_written()
+
+
+def catalog_cache_key(request, version=None):
+    version = catalog_version() if version is None else version
+    digest = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    # 'z': entries hold pre-compressed variants, not a single body
+    return f'catalog:z:{version}:{digest}'
+
+
+def make_etag(body):
+    return '"%s"' % hashlib.sha1(body).hexdigest()
+
+
+def variant_etag(etag, encoding):
+    # Each encoding is a different representation, so it gets its own strong ETag
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def catalog_cached(view):
+    """
+    Cache the rendered JSON of a catalog GET handler per catalog version and
+    URL, with a strong ETag over the exact bytes. The br / gzip variants are
+    compressed once and stored alongside, so a hit is one cache read and no
+    compression work; a matching If-None-Match gets a bodyless 304. Works on
+    APIView methods and @api_view functions.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        request = args[0] if hasattr(args[0], 'META') else args[1]
+        key = catalog_cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            response = view(*args, **kwargs)
+            if response.status_code != 200:
+                return response
+            body = ORJSONRenderer().render(response.data)
+            entry = (make_etag(body), encoded_variants(body))
+            # Don't pin possibly pre-change replica data under the new version
+            if not replica_may_be_stale(request):
+                cache.set(key, entry, CATALOG_CACHE_TIMEOUT)
+
+        etag, variants = entry
+        encoding = negotiate_encoding(request, [e for e in ENCODINGS if e in variants])
+        etag = variant_etag(etag, encoding)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(variants[encoding or 'identity'], content_type='application/json')
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Accept-Encoding',))
+        # Browsers keep the copy but revalidate it, getting a 304 until the catalog changes
+        patch_cache_control(response, no_cache=True)
+        return response
+    return wrapper
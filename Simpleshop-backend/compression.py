@@ -0,0 +1,141 @@
+# api/compression.py
+import gzip
+import zlib
+import brotli
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+
+# Server preference when the client accepts both equally: br is smaller for JSON
+ENCODINGS = ('br', 'gzip')
+
+# Stored variants are compressed once per catalog version, so they get the
+# slowest, smallest settings; per-request compression stays cheap
+STORED_LEVELS = {'br': 11, 'gzip': 9}
+DYNAMIC_LEVELS = {'br': 4, 'gzip': 6}
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'image/svg+xml')
+
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def negotiate_encoding(request, available=ENCODINGS):
+    """The best of `available` by the request's Accept-Encoding q-values, or None (identity)"""
+    accepted = {}
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(body, quality=level)
+    # mtime=0: the same body always gives the same bytes
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def iter_compressed(chunks, encoding, level):
+    """Compress an iterable of byte chunks incrementally"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        process, finish = compressor.compress, compressor.flush
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def encoded_variants(body):
+    """{'identity': body, 'br': ..., 'gzip': ...} to store; small bodies stay identity-only"""
+    variants = {'identity': body}
+    if len(body) >= settings.COMPRESSION_MIN_BYTES:
+        for encoding in ENCODINGS:
+            variants[encoding] = compress(body, encoding, STORED_LEVELS[encoding])
+    return variants
+
+
+def _compressible(request, response):
+    return (
+        request.method == 'GET'
+        and response.status_code == 200
+        and not response.has_header('Content-Encoding')
+        and not getattr(response, 'is_async', False)
+        and 'no-transform' not in response.get('Cache-Control', '')
+        and response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+        and (response.streaming or len(response.content) >= settings.COMPRESSION_MIN_BYTES)
+    )
+
+
+def _streamed(response, chunks):
+    """A StreamingHttpResponse with `response`'s status, headers and cookies"""
+    streamed = StreamingHttpResponse(chunks, status=response.status_code)
+    for header, value in response.items():
+        streamed[header] = value
+    streamed.cookies = response.cookies
+    return streamed
+
+
+class CompressionMiddleware:
+    """
+    br / gzip for dynamic GET responses, negotiated from Accept-Encoding.
+    Bodies over COMPRESSION_STREAM_BYTES and streaming responses are
+    compressed chunk by chunk as they are sent. Responses that already carry
+    a Content-Encoding (the catalog cache's stored variants) pass through.
+    Only GETs: token-bearing auth responses are POSTs and stay uncompressed
+    (BREACH).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not _compressible(request, response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate_encoding(request)
+        if encoding is None:
+            return response
+
+        level = DYNAMIC_LEVELS[encoding]
+        if response.streaming:
+            response.streaming_content = iter_compressed(response.streaming_content, encoding, level)
+            del response['Content-Length']
+        elif len(response.content) >= settings.COMPRESSION_STREAM_BYTES:
+            content = response.content
+            chunks = (content[i:i + STREAM_CHUNK_BYTES] for i in range(0, len(content), STREAM_CHUNK_BYTES))
+            response = _streamed(response, iter_compressed(chunks, encoding, level))
+            del response['Content-Length']
+        else:
+            response.content = compress(response.content, encoding, level)
+            response['Content-Length'] = str(len(response.content))
+
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and not etag.startswith('W/'):
+            # The compressed bytes differ from the ones the strong ETag describes
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,115 @@
+# api/db_router.py
+import contextvars
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from .ratelimit import client_ip
+
+REPLICA = 'replica'
+
+# Only catalog tables are ever read from the replica
+CATALOG_MODELS = {'product', 'productfacetcount'}
+
+CATALOG_WRITTEN_KEY = 'db:catalog-written'
+
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+
+
+def replica_configured():
+    return REPLICA in connections.settings
+
+
+def _user_id_from_token(request):
+    """User id from a bearer JWT without a DB query (catalog views skip authentication)"""
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if not header.startswith('Bearer '):
+        return None
+    from rest_framework_simplejwt.exceptions import TokenError
+    from rest_framework_simplejwt.tokens import AccessToken
+    try:
+        return AccessToken(header[7:]).get(settings.SIMPLE_JWT.get('USER_ID_CLAIM', 'user_id'))
+    except TokenError:
+        return None
+
+
+def _sticky_keys(request, user_id):
+    keys = [f'db:sticky:ip:{client_ip(request)}']
+    if user_id:
+        keys.append(f'db:sticky:user:{user_id}')
+    return keys
+
+
+def stick_to_primary(request, user_id=None):
+    """After a write, this client reads its own data from the primary for a while"""
+    cache.set_many({key: 1 for key in _sticky_keys(request, user_id)}, settings.REPLICA_STICKY_SECONDS)
+
+
+def catalog_written():
+    """Start the window in which replica reads may predate a catalog change"""
+    if replica_configured():
+        cache.set(CATALOG_WRITTEN_KEY, 1, settings.REPLICA_STICKY_SECONDS)
+
+
+def replica_may_be_stale(request):
+    """True if this request read the replica shortly after a catalog change"""
+    return getattr(request, 'read_from_replica', False) and cache.get(CATALOG_WRITTEN_KEY) is not None
+
+
+def replica_reads(view):
+    """
+    Run a catalog view's Product / facet reads on the replica, unless the
+    client wrote within REPLICA_STICKY_SECONDS. Works on APIView methods and
+    @api_view functions.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not replica_configured():
+            return view(*args, **kwargs)
+        request = args[0] if hasattr(args[0], 'META') else args[1]
+        if cache.get_many(_sticky_keys(request, _user_id_from_token(request))):
+            return view(*args, **kwargs)
+
+        request.read_from_replica = True
+        token = _use_replica.set(True)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+    return wrapper
+
+
+class StickyPrimaryMiddleware:
+    """Marks clients that made a successful write (POST/PUT/PATCH/DELETE)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            replica_configured()
+            and request.method not in ('GET', 'HEAD', 'OPTIONS')
+            and response.status_code < 400
+        ):
+            user = getattr(request, 'user', None)
+            stick_to_primary(request, user.id if user is not None and user.is_authenticated else None)
+        return response
+
+
+class PrimaryReplicaRouter:
+    """Writes and everything outside the catalog views stay on the primary"""
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and model._meta.model_name in CATALOG_MODELS and replica_configured():
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # the replica holds the same rows
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
@@ -0,0 +1,94 @@
+# api/facets.py
+import math
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Floor
+from .catalog_cache import bump_catalog_version
+from .filters import filter_products
+from .models import Product, ProductFacetCount
+
+# Query params that narrow the catalog; if none are present the global
+# summary table answers the request without touching Product
+FILTER_PARAMS = ('brand', 'category', 'min_price', 'max_price', 'min_rating', 'in_stock')
+
+FACETS = ('brand', 'category', 'rating', 'availability')
+
+
+def product_facet_keys(brand, category, rating, stock):
+    """The (facet, value) pairs a single product contributes to"""
+    return [
+        ('brand', brand),
+        ('category', category),
+        ('rating', str(int(math.floor(rating or 0)))),
+        ('availability', 'in_stock' if (stock or 0) > 0 else 'out_of_stock'),
+    ]
+
+
+def apply_facet_deltas(deltas):
+    """deltas: {(facet, value): +n / -n}, applied as atomic F() updates"""
+    with transaction.atomic():
+        for (facet, value), delta in deltas.items():
+            if not delta:
+                continue
+            ProductFacetCount.objects.get_or_create(facet=facet, value=value)
+            ProductFacetCount.objects.filter(facet=facet, value=value).update(count=F('count') + delta)
+
+
+def rebuild_facet_counts():
+    """Recompute the summary table from Product (for bulk imports / backfills)"""
+    counts = {}
+    rows = Product.objects.values_list('brand', 'category', 'rating', 'stock').iterator()
+    for brand, category, rating, stock in rows:
+        for key in product_facet_keys(brand, category, rating, stock):
+            counts[key] = counts.get(key, 0) + 1
+
+    with transaction.atomic():
+        ProductFacetCount.objects.all().delete()
+        ProductFacetCount.objects.bulk_create([
+            ProductFacetCount(facet=facet, value=value, count=count)
+            for (facet, value), count in counts.items()
+        ])
+        # The facet responses are cached per catalog version
+        transaction.on_commit(bump_catalog_version)
+    return len(counts)
+
+
+def has_filters(params):
+    return any(params.get(name) for name in FILTER_PARAMS)
+
+
+def global_facets():
+    result = {facet: {} for facet in FACETS}
+    rows = ProductFacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count')
+    for facet, value, count in rows:
+        result.setdefault(facet, {})[value] = count
+    return result
+
+
+def filtered_facets(params):
+    """
+    Counts for the current filter set, grouped in SQL. Each facet ignores its
+    own filter so selecting one brand still shows counts for the others.
+    Raises ValueError for malformed filter values.
+    """
+    products = Product.objects.all()
+    result = {}
+
+    qs = filter_products(products, params, exclude=('brand',))
+    result['brand'] = dict(qs.order_by().values_list('brand').annotate(n=Count('id')))
+
+    qs = filter_products(products, params, exclude=('category',))
+    result['category'] = dict(qs.order_by().values_list('category').annotate(n=Count('id')))
+
+    qs = filter_products(products, params, exclude=('rating',))
+    buckets = qs.order_by().annotate(bucket=Floor('rating')).values_list('bucket').annotate(n=Count('id'))
+    result['rating'] = {str(int(bucket)): n for bucket, n in buckets}
+
+    qs = filter_products(products, params, exclude=('in_stock',))
+    stock = qs.aggregate(
+        in_stock=Count('id', filter=Q(stock__gt=0)),
+        out_of_stock=Count('id', filter=Q(stock__lte=0)),
+    )
+    result['availability'] = {key: n for key, n in stock.items() if n}
+
+    return result
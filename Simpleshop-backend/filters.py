@@ -0,0 +1,108 @@
+# api/filters.py
+from decimal import Decimal, InvalidOperation
+from .models import Product
+
+# 🔃 Allowed ?sort= values -> ordering field (id is always the tiebreaker)
+PRODUCT_SORTS = {
+    'newest': '-id',
+    'price': 'price',
+    '-price': '-price',
+    'rating': 'rating',
+    '-rating': '-rating',
+    'name': 'name',
+}
+DEFAULT_PRODUCT_SORT = 'newest'
+
+_CATEGORIES = {value.lower(): value for value, _ in Product.CATEGORY_CHOICES}
+_BRANDS = {value.lower(): value for value, _ in Product.BRAND_CHOICES}
+
+
+def get_list_param(params, name):
+    """Read a multi-valued query param: ?brand=Apple&brand=Sony or ?brand=Apple,Sony"""
+    values = []
+    for raw in params.getlist(name):
+        values.extend(v.strip() for v in raw.split(',') if v.strip())
+    return values
+
+
+def _canonical(values, known):
+    # Map case-insensitive input onto the stored choice value so the filter
+    # can be an exact `IN (...)` that uses the indexes instead of `LIKE`.
+    return [known.get(v.lower(), v) for v in values]
+
+
+def _decimal_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Invalid {name}")
+
+
+def _float_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name}")
+
+
+def _bool_param(params, name):
+    value = params.get(name, '').lower()
+    if value in ('1', 'true', 'yes'):
+        return True
+    if value in ('0', 'false', 'no'):
+        return False
+    return None
+
+
+def filter_products(queryset, params, exclude=()):
+    """
+    Apply the catalog filters from the query string in SQL.
+
+    Supported params: brand, category (multi-valued), min_price, max_price,
+    min_rating, in_stock (true/false). `exclude` skips named filters (used by facets).
+    Raises ValueError for malformed numeric values.
+    """
+    if 'brand' not in exclude:
+        brands = _canonical(get_list_param(params, 'brand'), _BRANDS)
+        if brands:
+            queryset = queryset.filter(brand__in=brands)
+
+    if 'category' not in exclude:
+        categories = _canonical(get_list_param(params, 'category'), _CATEGORIES)
+        if categories:
+            queryset = queryset.filter(category__in=categories)
+
+    if 'price' not in exclude:
+        min_price = _decimal_param(params, 'min_price')
+        max_price = _decimal_param(params, 'max_price')
+        if min_price is not None:
+            queryset = queryset.filter(price__gte=min_price)
+        if max_price is not None:
+            queryset = queryset.filter(price__lte=max_price)
+
+    if 'rating' not in exclude:
+        min_rating = _float_param(params, 'min_rating')
+        if min_rating is not None:
+            queryset = queryset.filter(rating__gte=min_rating)
+
+    if 'in_stock' not in exclude:
+        in_stock = _bool_param(params, 'in_stock')
+        if in_stock is True:
+            queryset = queryset.filter(stock__gt=0)
+        elif in_stock is False:
+            queryset = queryset.filter(stock__lte=0)
+
+    return queryset
+
+
+def get_product_sort(params):
+    sort = params.get('sort') or DEFAULT_PRODUCT_SORT
+    if sort not in PRODUCT_SORTS:
+        raise ValueError("Invalid sort")
+    return PRODUCT_SORTS[sort]
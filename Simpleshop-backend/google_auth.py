@@ -0,0 +1,149 @@
+# api/google_auth.py
+import base64
+import re
+import threading
+import time
+import requests
+from django.conf import settings
+from google.auth import jwt
+from requests.adapters import HTTPAdapter
+
+# verify_oauth2_token() checks the same issuers
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+
+# Refresh in the background once less than this much lifetime is left
+REFRESH_MARGIN_SECONDS = 300
+# Lifetime used when the response carries no max-age
+DEFAULT_MAX_AGE_SECONDS = 3600
+# Don't hammer the endpoint when tokens carry an unknown kid
+MIN_FORCED_REFRESH_INTERVAL = 30
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+def _b64_int(value):
+    return int.from_bytes(base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)), 'big')
+
+
+def _jwks_to_pem(jwks):
+    """JWKS ({"keys": [...]}) -> {kid: PEM public key} as google.auth.jwt expects"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicNumbers
+
+    certs = {}
+    for key in jwks.get('keys', []):
+        if key.get('kty') != 'RSA':
+            continue
+        public_key = RSAPublicNumbers(_b64_int(key['e']), _b64_int(key['n'])).public_key()
+        certs[key['kid']] = public_key.public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+    return certs
+
+
+class GoogleCertCache:
+    """
+    In-process cache of Google's token signing keys. Honors the response's
+    Cache-Control max-age, refreshes in a background thread shortly before
+    expiry and keeps serving the last good keys if a refresh fails.
+    """
+
+    def __init__(self, certs_url, timeout=5, pool_size=4):
+        self.certs_url = certs_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.certs = None
+        self.expires_at = 0.0
+        self.last_fetch = 0.0
+        self.lock = threading.Lock()
+        self.refreshing = False
+
+    def _fetch(self):
+        response = self.session.get(self.certs_url, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        certs = _jwks_to_pem(data) if 'keys' in data else data
+
+        match = _MAX_AGE_RE.search(response.headers.get('Cache-Control', ''))
+        max_age = int(match.group(1)) if match else DEFAULT_MAX_AGE_SECONDS
+        max_age -= int(response.headers.get('Age', 0) or 0)
+
+        with self.lock:
+            self.certs = certs
+            self.expires_at = time.monotonic() + max(max_age, 0)
+            self.last_fetch = time.monotonic()
+        return certs
+
+    def _refresh_in_background(self):
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+
+        def run():
+            try:
+                self._fetch()
+            except (requests.RequestException, ValueError):
+                pass  # keep the current keys; the next request retries
+            finally:
+                with self.lock:
+                    self.refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def get(self, force=False):
+        now = time.monotonic()
+        certs, expires_at = self.certs, self.expires_at
+
+        if certs is None or (now >= expires_at and not self.refreshing) or (
+            force and now - self.last_fetch >= MIN_FORCED_REFRESH_INTERVAL
+        ):
+            try:
+                return self._fetch()
+            except (requests.RequestException, ValueError):
+                if certs is None:
+                    raise ValueError("Could not fetch Google signing certificates")
+                return certs  # stale but better than failing every login
+
+        if expires_at - now < REFRESH_MARGIN_SECONDS:
+            self._refresh_in_background()
+        return certs
+
+
+_cert_cache = None
+_cert_cache_lock = threading.Lock()
+
+
+def get_cert_cache():
+    global _cert_cache
+    with _cert_cache_lock:
+        if _cert_cache is None:
+            _cert_cache = GoogleCertCache(settings.GOOGLE_CERTS_URL)
+    return _cert_cache
+
+
+def verify_google_token(token, cert_cache=None):
+    """
+    Drop-in for id_token.verify_oauth2_token(token, requests.Request()) using
+    cached keys. Raises ValueError for invalid tokens.
+    """
+    cert_cache = cert_cache or get_cert_cache()
+    audience = getattr(settings, 'GOOGLE_OAUTH_CLIENT_ID', None)
+
+    certs = cert_cache.get()
+    try:
+        kid = jwt.decode_header(token).get('kid')
+    except (ValueError, TypeError):
+        raise ValueError("Malformed token")
+    if kid and kid not in certs:
+        # Google rotated its keys before our cached copy expired
+        certs = cert_cache.get(force=True)
+
+    idinfo = jwt.decode(token, certs=certs, audience=audience)
+    if idinfo.get('iss') not in GOOGLE_ISSUERS:
+        raise ValueError(f"Wrong issuer: {idinfo.get('iss')}")
+    return idinfo
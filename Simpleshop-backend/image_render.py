@@ -0,0 +1,67 @@
+# api/image_render.py
+# Runs inside the image process pool: keep this module free of Django
+# imports so spawned workers start fast and never touch the database.
+import os
+import tempfile
+from PIL import Image, ImageOps
+
+# format -> (Pillow format name, file extension, extra save options)
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'optimize': True, 'progressive': True}),
+}
+
+
+def _for_format(image, fmt):
+    if fmt == 'jpeg' and image.mode not in ('RGB', 'L'):
+        # JPEG has no alpha: flatten transparent product shots onto white
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    if fmt == 'webp' and image.mode not in ('RGB', 'RGBA'):
+        return image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+    return image
+
+
+def _save_atomic(image, path, fmt, quality):
+    pil_format, _, options = FORMATS[fmt]
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as dest:
+            image.save(dest, pil_format, quality=quality, **options)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def render_renditions(source, out_dir, widths, qualities, only=None):
+    """
+    Write <width>.<ext> into `out_dir` for every width and format in
+    `qualities` ({format: quality}). Images are never upscaled: widths beyond
+    the original are saved at the original size. `only` limits the work to
+    one (width, format) pair. Returns the written paths.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with Image.open(source) as original:
+        original = ImageOps.exif_transpose(original)
+        original.load()
+
+    written = []
+    for width in sorted(widths, reverse=True):
+        if only and only[0] != width:
+            continue
+        if original.width > width:
+            height = max(1, round(original.height * width / original.width))
+            image = original.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        else:
+            image = original
+        for fmt, quality in qualities.items():
+            if only and only[1] != fmt:
+                continue
+            path = os.path.join(out_dir, f'{width}.{FORMATS[fmt][1]}')
+            _save_atomic(_for_format(image, fmt), path, fmt, quality)
+            written.append(path)
+    return written
@@ -0,0 +1,132 @@
+# api/images.py
+import hashlib
+import multiprocessing
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from django.conf import settings
+from django.http import FileResponse
+from .image_render import FORMATS, render_renditions
+
+# Renditions live at MEDIA_ROOT/renditions/products/<id>/<key>/<width>.<ext>.
+# <key> hashes the original's file name, so a replaced image gets new URLs
+# (cacheable forever) and URLs are built without touching the disk.
+
+RENDITIONS_DIR = 'renditions/products'
+CONTENT_TYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+EXTENSIONS = {ext: fmt for fmt, (_, ext, _) in FORMATS.items()}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_image_pool():
+    """Bounded process pool for Pillow work (spawned, like the invoice pool)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+    return _pool
+
+
+def rendition_key(image_name):
+    return hashlib.sha1(image_name.encode()).hexdigest()[:12]
+
+
+def rendition_dir(product_id, image_name):
+    return Path(settings.MEDIA_ROOT) / RENDITIONS_DIR / str(product_id) / rendition_key(image_name)
+
+
+def rendition_path(product_id, image_name, width, fmt):
+    return rendition_dir(product_id, image_name) / f'{width}.{FORMATS[fmt][1]}'
+
+
+def media_base_url(request=None):
+    """MEDIA_URL, absolute when there is a request. Resolve it once per response, not per row."""
+    if request is None:
+        return settings.MEDIA_URL
+    return request.build_absolute_uri(settings.MEDIA_URL)
+
+
+def image_renditions(product_id, image_name, media_url=None):
+    """
+    {'webp': {'srcset': ..., 'urls': {width: url}}, 'jpeg': {...}} for an
+    image name, or None. Pure string work: safe to call for every row.
+    """
+    if not image_name:
+        return None
+    base = f'{media_url or settings.MEDIA_URL}{RENDITIONS_DIR}/{product_id}/{rendition_key(image_name)}/'
+    renditions = {}
+    for fmt, (_, ext, _) in FORMATS.items():
+        urls = {width: f'{base}{width}.{ext}' for width in settings.IMAGE_RENDITION_WIDTHS}
+        renditions[fmt] = {
+            'srcset': ', '.join(f'{url} {width}w' for width, url in urls.items()),
+            'urls': urls,
+        }
+    return renditions
+
+
+def _render_args(product):
+    return (
+        product.image.path,
+        str(rendition_dir(product.id, product.image.name)),
+        list(settings.IMAGE_RENDITION_WIDTHS),
+        dict(settings.IMAGE_RENDITION_QUALITY),
+    )
+
+
+def _remove_stale(product_id, image_name):
+    current = rendition_dir(product_id, image_name)
+    for old in current.parent.iterdir():
+        if old != current:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def renditions_complete(product):
+    return all(
+        rendition_path(product.id, product.image.name, width, fmt).exists()
+        for width in settings.IMAGE_RENDITION_WIDTHS for fmt in FORMATS
+    )
+
+
+def submit_renditions(product, pool=None, force=False):
+    """Render every rendition of the product's image in the pool; None if all exist"""
+    if not product.image or (not force and renditions_complete(product)):
+        return None
+    product_id, image_name = product.id, product.image.name
+    future = (pool or get_image_pool()).submit(render_renditions, *_render_args(product))
+
+    def on_done(f):
+        if f.exception() is None:
+            _remove_stale(product_id, image_name)
+
+    future.add_done_callback(on_done)
+    return future
+
+
+def prerender_renditions(product_id):
+    """Fire-and-forget after an upload (hooked to Product commits in signals.py)"""
+    from .models import Product
+    product = Product.objects.filter(id=product_id).only('id', 'image').first()
+    if product is not None:
+        submit_renditions(product)
+
+
+def ensure_rendition(product, width, fmt, timeout=None):
+    """Path of one rendition, rendering just that one on a miss"""
+    path = rendition_path(product.id, product.image.name, width, fmt)
+    if not path.exists():
+        future = get_image_pool().submit(render_renditions, *_render_args(product), only=(width, fmt))
+        future.result(timeout=timeout or settings.IMAGE_RENDER_TIMEOUT)
+    return path
+
+
+def rendition_response(path, fmt):
+    response = FileResponse(open(path, 'rb'), content_type=CONTENT_TYPES[fmt])
+    # The URL changes whenever the image does
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
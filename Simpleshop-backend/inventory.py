@@ -0,0 +1,150 @@
+# api/inventory.py
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, When, IntegerField
+from django.utils import timezone
+from .models import Product, StockReservation
+from .facets import apply_facet_deltas
+from .catalog_cache import bump_catalog_version
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_ids):
+        self.product_ids = sorted(product_ids)
+        super().__init__(f"Insufficient stock for products: {self.product_ids}")
+
+
+def _per_product(lines):
+    return Case(*[When(id=pk, then=qty) for pk, qty in lines.items()], output_field=IntegerField())
+
+
+def _stock_changed(went_out, came_back):
+    # queryset.update() skips the Product signals: keep the availability facet
+    # counts and the catalog cache version in step by hand. Only products
+    # flipping between in and out of stock invalidate the catalog cache; a
+    # bump per checkout would empty it under load. Cached stock figures may
+    # lag until the next bump or CATALOG_CACHE_TIMEOUT - checkout re-checks
+    # stock in the database, so they are display-only.
+    if not (went_out or came_back):
+        return
+    apply_facet_deltas({
+        ('availability', 'in_stock'): came_back - went_out,
+        ('availability', 'out_of_stock'): went_out - came_back,
+    })
+    transaction.on_commit(bump_catalog_version)
+
+
+def decrement_stock(lines):
+    """
+    lines: {product_id: quantity}. One conditional UPDATE for the whole order:
+    every product's stock drops by its quantity only where `stock >= quantity`.
+    If any line is short the caller's transaction must roll back, which the
+    raised InsufficientStock does for an enclosing atomic block.
+    """
+    lines = {pk: qty for pk, qty in lines.items() if qty > 0}
+    if not lines:
+        return
+    needed = _per_product(lines)
+    try:
+        # Savepoint: undo the lines that did fit before reporting the short ones
+        with transaction.atomic():
+            updated = Product.objects.filter(id__in=lines, stock__gte=needed).update(stock=F('stock') - needed)
+            if updated != len(lines):
+                raise InsufficientStock([])
+    except InsufficientStock:
+        available = dict(Product.objects.filter(id__in=lines).values_list('id', 'stock'))
+        raise InsufficientStock(pk for pk, qty in lines.items() if available.get(pk, 0) < qty)
+    _stock_changed(went_out=Product.objects.filter(id__in=lines, stock=0).count(), came_back=0)
+
+
+def increment_stock(lines):
+    lines = {pk: qty for pk, qty in lines.items() if qty > 0}
+    if not lines:
+        return
+    added = _per_product(lines)
+    Product.objects.filter(id__in=lines).update(stock=F('stock') + added)
+    # Products whose stock was <= 0 before this increment are back in stock
+    came_back = Product.objects.filter(id__in=lines, stock__gt=0, stock__lte=added).count()
+    _stock_changed(went_out=0, came_back=came_back)
+
+
+def order_lines(items):
+    """[{product_id, quantity}] -> {product_id: total quantity}"""
+    lines = Counter()
+    for item in items:
+        lines[item['product_id']] += item['quantity']
+    return dict(lines)
+
+
+def reserve_stock(user, lines, reference):
+    """Hold stock for a checkout until STOCK_RESERVATION_MINUTES pass"""
+    expires_at = timezone.now() + timedelta(minutes=settings.STOCK_RESERVATION_MINUTES)
+    with transaction.atomic():
+        decrement_stock(lines)
+        StockReservation.objects.bulk_create([
+            StockReservation(user=user, product_id=pk, quantity=qty, reference=reference, expires_at=expires_at)
+            for pk, qty in lines.items()
+        ])
+
+
+def commit_order_stock(order, lines, reference=None, allow_shortfall=False):
+    """
+    Take stock for a placed order. Active reservations for the payment
+    reference are consumed; anything not covered by them is decremented now
+    and reserved surplus is returned. Call inside the order's transaction.
+
+    Raises InsufficientStock if a line can't be covered, unless
+    allow_shortfall (the order is already paid for): then the lines that can
+    be covered still take their stock, and the ids of the products that
+    could not are returned.
+    """
+    reserved = Counter()
+    if reference:
+        active = StockReservation.objects.filter(
+            user=order.user, reference=reference,
+            status=StockReservation.ACTIVE, expires_at__gt=timezone.now(),
+        )
+        # Conditional update, so a reservation released concurrently is not counted
+        active.update(status=StockReservation.CONSUMED, order=order)
+        for pk, qty in StockReservation.objects.filter(order=order).values_list('product_id', 'quantity'):
+            reserved[pk] += qty
+
+    missing = {pk: qty - reserved[pk] for pk, qty in lines.items() if qty > reserved[pk]}
+    surplus = {pk: qty - lines.get(pk, 0) for pk, qty in reserved.items() if qty > lines.get(pk, 0)}
+    short = set()
+    while True:
+        try:
+            decrement_stock({pk: qty for pk, qty in missing.items() if pk not in short})
+            break
+        except InsufficientStock as e:
+            # Nothing was taken; retry without the short lines
+            if not allow_shortfall:
+                raise
+            short.update(e.product_ids)
+    increment_stock(surplus)
+    return short
+
+
+def release_expired_reservations():
+    """Give stock back for abandoned payments; returns the number released"""
+    with transaction.atomic():
+        expired = list(
+            StockReservation.objects
+            .filter(status=StockReservation.ACTIVE, expires_at__lte=timezone.now())
+            .values_list('id', 'product_id', 'quantity')
+        )
+        if not expired:
+            return 0
+        # Only rows still active are released; one consumed meanwhile keeps its stock
+        released = 0
+        lines = Counter()
+        for reservation_id, pk, qty in expired:
+            if StockReservation.objects.filter(id=reservation_id, status=StockReservation.ACTIVE).update(
+                status=StockReservation.RELEASED
+            ):
+                released += 1
+                lines[pk] += qty
+        increment_stock(dict(lines))
+    return released
@@ -0,0 +1,198 @@
+# api/invoices.py
+import hashlib
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.template.loader import get_template
+from django.db.models import Prefetch
+from django.utils import timezone
+from .models import Order, OrderItem
+from .pdf_render import render_pdf_to_file
+
+# Rendered invoices live at INVOICE_ROOT/<order id>/<sha256 of the html>.pdf,
+# so a changed order gets a new file and an unchanged one is never re-rendered
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    """Bounded process pool for xhtml2pdf (spawned, not forked from a threaded server)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.INVOICE_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+    return _pool
+
+
+def invoice_orders():
+    """Orders with everything invoice.html reads, in a constant number of queries"""
+    items = OrderItem.objects.select_related('product')
+    return Order.objects.select_related('user', 'address').prefetch_related(Prefetch('items', queryset=items))
+
+
+def orders_created_between(orders, start, end):
+    """
+    Orders created on the days start..end (inclusive). A half-open datetime
+    range instead of __date, so order_created_idx serves both the filter and
+    the (created_at, id) order.
+    """
+    start_at = timezone.make_aware(datetime.combine(start, time.min))
+    end_at = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+    return orders.filter(created_at__gte=start_at, created_at__lt=end_at).order_by('created_at', 'id')
+
+
+def render_invoice_html(order):
+    items = [
+        {
+            "product_name": item.product.name,
+            "quantity": item.quantity,
+            "price": item.price,
+            "subtotal": item.quantity * item.price
+        }
+        for item in order.items.all()
+    ]
+    context = {
+        'order': order,
+        'items': items
+    }
+    return get_template('invoice.html').render(context)
+
+
+def invoice_path(order_id, html):
+    digest = hashlib.sha256(html.encode()).hexdigest()
+    return Path(settings.INVOICE_ROOT) / str(order_id) / f'{digest}.pdf'
+
+
+def _remove_stale(path):
+    for old in path.parent.glob('*.pdf'):
+        if old != path:
+            old.unlink(missing_ok=True)
+
+
+def submit_render(order, pool=None):
+    """
+    Return (path, future). `future` is None when the PDF for the order's
+    current content is already on disk.
+    """
+    html = render_invoice_html(order)
+    path = invoice_path(order.id, html)
+    if path.exists():
+        return path, None
+    future = (pool or get_render_pool()).submit(render_pdf_to_file, html, str(path))
+
+    def on_done(f):
+        if f.exception() is None:
+            _remove_stale(path)
+
+    future.add_done_callback(on_done)
+    return path, future
+
+
+def ensure_invoice(order, timeout=None):
+    """Path of the order's rendered invoice, rendering it in the pool on a miss"""
+    path, future = submit_render(order)
+    if future is not None:
+        future.result(timeout=timeout or settings.INVOICE_RENDER_TIMEOUT)
+    return path
+
+
+def prerender_invoice(order_id):
+    """Fire-and-forget render after payment (hooked to Order commits in signals.py)"""
+    order = invoice_orders().filter(id=order_id).first()
+    if order is not None:
+        submit_render(order)
+
+
+def invoice_response(order, path):
+    filename = f'invoice_order_{order.id}.pdf'
+    header = settings.INVOICE_SENDFILE_HEADER
+    if header:
+        # The front web server streams the file; Django only names it
+        response = HttpResponse(content_type='application/pdf')
+        if header == 'X-Accel-Redirect':
+            relative = os.path.relpath(path, settings.INVOICE_ROOT)
+            response[header] = settings.INVOICE_SENDFILE_PREFIX + relative.replace(os.sep, '/')
+        else:
+            response[header] = str(path)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type='application/pdf')
+
+
+# ---------------- Bulk export ----------------
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+class _ZipStream:
+    """Write-only sink for ZipFile; the generator drains it after every chunk"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offset = 0
+
+    def write(self, data):
+        self.buffer += data
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def iter_invoice_zip(orders, pool=None):
+    """
+    Yield a ZIP of the orders' invoices chunk by chunk. Cached PDFs are added
+    first, missing ones as they finish rendering in parallel; at most one
+    chunk of one PDF is held in memory.
+    """
+    stream = _ZipStream()
+    archive = zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED)
+    ready, pending, failed = [], {}, []
+
+    for order in orders:
+        path, future = submit_render(order, pool)
+        if future is None:
+            ready.append((order, path))
+        else:
+            pending[future] = (order, path)
+
+    def add(order, path):
+        with open(path, 'rb') as source, archive.open(f'invoice_order_{order.id}.pdf', 'w') as dest:
+            while chunk := source.read(EXPORT_CHUNK_SIZE):
+                dest.write(chunk)
+                yield stream.drain()
+        yield stream.drain()
+
+    for order, path in ready:
+        yield from add(order, path)
+
+    for future in as_completed(pending):
+        order, path = pending[future]
+        if future.exception() is not None:
+            failed.append(f"{order.id}: {future.exception()}")
+            continue
+        yield from add(order, path)
+
+    if failed:
+        archive.writestr('errors.txt', '\n'.join(failed))
+    archive.close()
+    yield stream.drain()
@@ -0,0 +1,249 @@
+import re
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.urls.resolvers import RoutePattern
+from rest_framework.test import APIClient
+from api.benchmarking import benchmark_database
+from api.models import CustomUser, Product, UserAddress, Order, OrderItem, CartItem
+from api.seeding import build_products
+
+# Only our own API is audited (admin and dj-rest-auth are third-party)
+AUDITED_PREFIXES = ('api/', 'invoice/')
+
+# Views that talk to outside services or render PDFs; their SQL is covered elsewhere
+SKIPPED_VIEWS = {
+    'GoogleSignupAPIView': "verifies tokens against Google",
+    'GoogleLoginAPIView': "verifies tokens against Google",
+    'RazorpayOrderCreateView': "creates a Razorpay order",
+    'generate_invoice': "renders a PDF (queries: check_query_budgets)",
+}
+
+# Requests per view and method. Views not listed get one call per method with
+# no data. '{product}', '{order}', '{address}', '{email}' are filled from the seed.
+SAMPLES = {
+    'ProductListView': {'get': [
+        {},
+        {'sort': 'price', 'category': '{category}'},
+        {'sort': '-price', 'brand': '{brand}'},
+        {'sort': 'rating', 'min_rating': 4},
+        {'sort': 'name'},
+        {'in_stock': 'true'},
+    ]},
+    'ProductFacetsView': {'get': [{}, {'category': '{category}'}]},
+    'ProductSearchView': {'get': [{'q': 'phone'}]},
+    'ProductSuggestView': {'get': [{'q': 'phon'}]},
+    'CartView': {
+        'post': [{'product_id': '{product}', 'quantity': 1}],
+        'delete': [{'product_id': '{product}'}],
+    },
+    'CartBatchView': {'post': [{'operations': [
+        {'op': 'add', 'product_id': '{product}', 'quantity': 2},
+        {'op': 'remove', 'product_id': '{other_product}'},
+    ]}]},
+    'CartMergeView': {'post': [{'items': [{'product_id': '{product}', 'quantity': 3}]}]},
+    'CreateOrderView': {'post': [{
+        'address': '{address}', 'total_price': '100.00', 'is_paid': False,
+        'items': [{'product': '{product}', 'quantity': 1, 'price': '100.00'}],
+    }]},
+    'SendOTPView': {'post': [{'email': '{email}'}]},
+    'VerifyOTPView': {'post': [{'email': '{email}', 'otp': '123456'}]},
+    'ResetPasswordView': {'post': [{'email': '{email}', 'new_password': 'x', 'confirm_password': 'x'}]},
+    # A range that covers the seeded orders, so the item / product prefetches run too
+    'export_invoices': {'get': [{'start': '2024-01-01', 'end': '2030-12-31'}]},
+    'UserOrdersView': {'get': [{}, {'view': 'summary'}, {'view': 'summary', 'page_size': 5}]},
+    'sales_analytics': {'get': [
+        {'start': '2024-01-01', 'end': '2030-12-31'},
+        {'start': '2024-01-01', 'end': '2030-12-31', 'by': 'category,brand'},
+        {'start': '2024-01-01', 'end': '2030-12-31', 'by': 'day', 'category': '{category}'},
+    ]},
+}
+
+# Plan lines that fail the audit
+PROBLEMS = [
+    (re.compile(r'^SCAN (TABLE )?\w+$'), "full table scan"),
+    (re.compile(r'USE TEMP B-TREE'), "sort / grouping without an index"),
+]
+
+# Known and accepted: (view name or '*', sample or None for any, plan line regex, reason)
+ALLOWED = [
+    ('*', None, r'^SCAN (TABLE )?api_productfacetcount$', "summary table, one row per facet value"),
+    ('ProductListView', {}, r'^SCAN (TABLE )?api_product$', "unfiltered newest-first walks the rowid with LIMIT"),
+    ('ProductListView', {'in_stock': 'true'}, r'^SCAN (TABLE )?api_product$',
+     "newest in-stock first: most products are in stock, so the rowid walk stops after about a page"),
+    ('ProductFacetsView', None, r'USE TEMP B-TREE FOR GROUP BY', "counts over the filtered set"),
+    ('ProductSearchView', None, r'USE TEMP B-TREE FOR ORDER BY', "bm25 ranking of FTS matches"),
+    ('ProductSuggestView', None, r'USE TEMP B-TREE FOR ORDER BY', "ranking vocabulary candidates"),
+    ('sales_analytics', None, r'USE TEMP B-TREE', "grouping rollup rows by category / brand"),
+]
+
+_PARAM_RE = re.compile(r'<(?:\w+:)?(\w+)>')
+
+
+class _Rollback(Exception):
+    pass
+
+
+def iter_routes(patterns, prefix=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            if isinstance(pattern.pattern, RoutePattern):
+                yield from iter_routes(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern) and isinstance(pattern.pattern, RoutePattern):
+            yield prefix + str(pattern.pattern), pattern.callback
+
+
+def is_allowed(view_name, data, line):
+    return any(
+        scope in ('*', view_name) and (sample is None or sample == data) and re.search(regex, line)
+        for scope, sample, regex, _ in ALLOWED
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Call every API route against a seeded database, EXPLAIN QUERY PLAN each SQL "
+        "statement and fail on unexpected full scans or temp B-tree sorts (SQLite)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=2000)
+        parser.add_argument('--orders', type=int, default=50)
+
+    def seed(self, products, orders):
+        user = CustomUser.objects.create_user(
+            email='plan-audit@example.com', full_name='Plan Audit', password='x', is_staff=True,
+        )
+        address = UserAddress.objects.create(
+            user=user, name='Plan Audit', mobile_number='9999999999', address='1 Test Street',
+            locality='Test', city='Pune', state='Maharashtra', pincode='411001',
+        )
+        catalog = list(build_products(products))
+        for product in catalog:
+            product.stock = 1000
+        catalog = Product.objects.bulk_create(catalog)
+
+        for n in range(orders):
+            order = Order.objects.create(user=user, address=address, total_price=0)
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, quantity=1, price=product.price)
+                for product in catalog[n % 50:n % 50 + 3]
+            ])
+        CartItem.objects.bulk_create([CartItem(user=user, product=p, quantity=1) for p in catalog[:5]])
+
+        return user, {
+            'product': catalog[0].id,
+            'other_product': catalog[1].id,
+            'category': catalog[0].category,
+            'brand': catalog[0].brand,
+            'order': order.id,
+            'address': address.id,
+            'email': user.email,
+        }
+
+    def fill(self, value, ids):
+        if isinstance(value, dict):
+            return {k: self.fill(v, ids) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.fill(v, ids) for v in value]
+        if isinstance(value, str) and value.startswith('{') and value.endswith('}'):
+            return ids[value[1:-1]]
+        return value
+
+    def url_for(self, route, ids):
+        def param(match):
+            name = match.group(1)
+            if name in ('order_id', 'product_id'):
+                return str(ids[name[:-3]])
+            for kind in ('address', 'order'):
+                if kind in route:
+                    return str(ids[kind])
+            return str(ids['product'])
+        return '/' + _PARAM_RE.sub(param, route)
+
+    def call(self, client, method, url, data):
+        """Run one request in a rolled-back savepoint; returns (status, [(sql, params)])"""
+        statements = []
+
+        def capture(execute, sql, params, many, context):
+            if not many:
+                statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        status = None
+        try:
+            with transaction.atomic():
+                with connection.execute_wrapper(capture):
+                    if method == 'get':
+                        response = client.get(url, data)
+                    else:
+                        response = getattr(client, method)(url, data, format='json')
+                    if response.streaming:
+                        # Streamed bodies (the invoice export) run their queries as they are read
+                        b''.join(response.streaming_content)
+                status = response.status_code
+                raise _Rollback
+        except _Rollback:
+            pass
+        return status, statements
+
+    def explain(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def audit(self, user, ids):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        failures, verbose = [], self.verbosity > 1
+
+        for route, callback in iter_routes(get_resolver().url_patterns):
+            view_cls = getattr(callback, 'cls', None)
+            if not route.startswith(AUDITED_PREFIXES) or view_cls is None:
+                continue
+            view_name = view_cls.__name__
+            if view_name in SKIPPED_VIEWS:
+                self.stdout.write(f"SKIP {route} ({view_name}: {SKIPPED_VIEWS[view_name]})")
+                continue
+
+            url = self.url_for(route, ids)
+            methods = [m for m in ('get', 'post', 'put', 'patch', 'delete') if hasattr(view_cls, m)]
+            for method in methods:
+                for data in SAMPLES.get(view_name, {}).get(method, [{}]):
+                    status, statements = self.call(client, method, url, self.fill(data, ids))
+                    label = f"{method.upper()} {url} {data or ''}".strip()
+                    self.stdout.write(f"{label} -> {status}, {len(statements)} statements")
+
+                    for sql, params in statements:
+                        if not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'WITH')):
+                            continue
+                        for line in self.explain(sql, params):
+                            if verbose:
+                                self.stdout.write(f"    {line}")
+                            for regex, problem in PROBLEMS:
+                                if regex.search(line) and not is_allowed(view_name, data, line):
+                                    failures.append((label, problem, line, sql))
+        return failures
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("The plan audit reads SQLite's EXPLAIN QUERY PLAN output")
+        self.verbosity = options['verbosity']
+
+        setup_test_environment()
+        # No cache: catalog responses and rate limits must not short-circuit the SQL
+        dummy_cache = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        try:
+            # A throwaway test database: the seed never lands in, or locks, the configured one
+            with override_settings(CACHES=dummy_cache), benchmark_database():
+                user, ids = self.seed(options['products'], options['orders'])
+                failures = self.audit(user, ids)
+        finally:
+            teardown_test_environment()
+
+        for label, problem, line, sql in failures:
+            self.stdout.write(self.style.ERROR(f"{label}: {problem}: {line}\n    {sql[:300]}"))
+        if failures:
+            raise CommandError(f"{len(failures)} unexpected scans or sorts")
+        self.stdout.write(self.style.SUCCESS("No unexpected scans or temp B-tree sorts"))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.models import Order, UserOrderSequence
+
+
+class Command(BaseCommand):
+    help = (
+        "Populate UserOrderSequence from existing orders. Orders without a number, "
+        "or sharing one with an older order of the same user, get the next free number."
+    )
+
+    def handle(self, *args, **options):
+        renumbered = 0
+        users = 0
+        with transaction.atomic():
+            user_ids = Order.objects.order_by().values_list('user_id', flat=True).distinct()
+            for user_id in user_ids.iterator():
+                orders = list(
+                    Order.objects.filter(user_id=user_id)
+                    .order_by('created_at', 'id')
+                    .values_list('id', 'user_order_number')
+                )
+                last_number = max((number or 0 for _, number in orders), default=0)
+                seen = set()
+                for order_id, number in orders:
+                    if number and number not in seen:
+                        seen.add(number)
+                        continue
+                    last_number += 1
+                    Order.objects.filter(id=order_id).update(user_order_number=last_number)
+                    seen.add(last_number)
+                    renumbered += 1
+
+                UserOrderSequence.objects.update_or_create(
+                    user_id=user_id, defaults={'last_number': last_number}
+                )
+                users += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled order sequences for {users} users ({renumbered} orders renumbered)"
+        ))
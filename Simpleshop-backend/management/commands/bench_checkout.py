@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+from api.models import CustomUser, Product
+from api.seeding import build_products
+from api.benchmarking import benchmark_database, timed
+from api.views import CreateOrderView
+
+
+class Command(BaseCommand):
+    help = "Benchmark order creation latency for carts of 1, 10 and 100 lines (changes are rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100])
+        parser.add_argument('--repeat', type=int, default=30)
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.run(options)
+
+    def run(self, options):
+        factory = APIRequestFactory()
+        view = CreateOrderView.as_view()
+
+        with transaction.atomic():
+            user = CustomUser.objects.create_user(email='bench-checkout@example.com', full_name='Bench')
+            products = list(build_products(max(options['sizes'])))
+            for product in products:
+                product.stock = 1_000_000  # checkout now takes stock
+            Product.objects.bulk_create(products)
+
+            for size in options['sizes']:
+                payload = {
+                    'total_price': str(sum(p.price for p in products[:size])),
+                    'is_paid': True,
+                    'items': [
+                        {'product': p.id, 'quantity': 1, 'price': str(p.price)}
+                        for p in products[:size]
+                    ],
+                }
+
+                def checkout():
+                    request = factory.post('/api/orders/create/', payload, format='json')
+                    force_authenticate(request, user=user)
+                    response = view(request)
+                    assert response.status_code == 201, response.data
+
+                result = timed(checkout, options['repeat'])
+                self.stdout.write(
+                    f"{size:4} lines: p50={result['p50']:.2f}ms p95={result['p95']:.2f}ms p99={result['p99']:.2f}ms"
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,119 @@
+import datetime
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.core.management.base import BaseCommand, CommandError
+from google.auth import crypt, jwt
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token
+from api.benchmarking import timed
+from api.google_auth import GoogleCertCache, verify_google_token
+
+KID = 'local-test-key'
+
+
+def _make_key_material():
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+    import base64
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'local-google-stand-in')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name)
+        .public_key(key.public_key()).serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+
+    def b64(n):
+        return base64.urlsafe_b64encode(n.to_bytes((n.bit_length() + 7) // 8, 'big')).decode().rstrip('=')
+
+    numbers = key.public_key().public_numbers()
+    pem_certs = {KID: cert.public_bytes(serialization.Encoding.PEM).decode()}
+    jwks = {'keys': [{'kty': 'RSA', 'alg': 'RS256', 'use': 'sig', 'kid': KID, 'n': b64(numbers.n), 'e': b64(numbers.e)}]}
+    return private_pem, pem_certs, jwks
+
+
+class Command(BaseCommand):
+    help = (
+        "Check and benchmark cached Google ID token verification against a local "
+        "certificate stand-in, compared with a fresh verify_oauth2_token-style fetch per call"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--jwks', action='store_true', help="Serve a JWKS document instead of PEM certs")
+        parser.add_argument('--max-age', type=int, default=3600)
+
+    def handle(self, *args, **options):
+        private_pem, pem_certs, jwks = _make_key_material()
+        body = json.dumps(jwks if options['jwks'] else pem_certs).encode()
+        fetches = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fetches.append(1)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Cache-Control', f"public, max-age={options['max_age']}")
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_port}/oauth2/v1/certs'
+
+        now = int(time.time())
+        signer = crypt.RSASigner.from_string(private_pem, key_id=KID)
+        claims = {'iss': 'https://accounts.google.com', 'sub': '1', 'email': 'user@example.com',
+                  'iat': now, 'exp': now + 600}
+        token = jwt.encode(signer, claims).decode()
+        forged = jwt.encode(signer, {**claims, 'iss': 'https://evil.example.com'}).decode()
+
+        try:
+            cache = GoogleCertCache(url)
+            if verify_google_token(token, cache)['email'] != 'user@example.com':
+                raise CommandError("Valid token was not accepted")
+            try:
+                verify_google_token(forged, cache)
+                raise CommandError("Token with the wrong issuer was accepted")
+            except ValueError:
+                pass
+            try:
+                verify_google_token(token[:-4] + 'AAAA', cache)
+                raise CommandError("Token with a bad signature was accepted")
+            except ValueError:
+                pass
+            self.stdout.write("Verification checks passed")
+
+            fetches.clear()
+            cached = timed(lambda: verify_google_token(token, cache), options['repeat'])
+            cached_fetches = len(fetches)
+
+            fetches.clear()
+            uncached = timed(
+                lambda: id_token.verify_token(token, google_requests.Request(), certs_url=url)
+                if not options['jwks'] else verify_google_token(token, GoogleCertCache(url)),
+                options['repeat'],
+            )
+            uncached_fetches = len(fetches)
+        finally:
+            server.shutdown()
+
+        self.stdout.write(
+            f"fetch per call : p50={uncached['p50']:.3f}ms p95={uncached['p95']:.3f}ms ({uncached_fetches} cert fetches)\n"
+            f"cached keys    : p50={cached['p50']:.3f}ms p95={cached['p95']:.3f}ms ({cached_fetches} cert fetches)"
+        )
@@ -0,0 +1,60 @@
+import json
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from api.models import Product
+from api.product_rows import PRODUCT_COLUMNS, ProductRows
+from api.renderers import ORJSONRenderer
+from api.seeding import build_products
+from api.serializers import ProductSerializer
+from api.benchmarking import benchmark_database, timed
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark product list serialization: ProductSerializer + JSONRenderer vs "
+        "values_list() rows + ORJSONRenderer (seeded products are rolled back)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000', help="Comma-separated list sizes")
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.run(options)
+
+    def run(self, options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        with transaction.atomic():
+            start = time.perf_counter()
+            products = list(build_products(sizes[-1]))
+            for i, product in enumerate(products):
+                # URL building is part of the cost; the files don't need to exist
+                product.image = f'product_images/bench-{i}.jpg'
+            Product.objects.bulk_create(products, batch_size=2000)
+            first_id = Product.objects.order_by('-id').values_list('id', flat=True)[sizes[-1] - 1]
+            self.stdout.write(f"Seeded {len(products)} products in {time.perf_counter() - start:.1f}s")
+
+            for size in sizes:
+                queryset = Product.objects.filter(id__gte=first_id).order_by('id')[:size]
+
+                def serializer():
+                    return JSONRenderer().render(ProductSerializer(list(queryset), many=True).data)
+
+                def rows():
+                    return ORJSONRenderer().render(ProductRows().products(queryset.values_list(*PRODUCT_COLUMNS)))
+
+                if json.loads(serializer()) != json.loads(rows()):
+                    raise CommandError(f"Fast path output differs from ProductSerializer at {size} products")
+
+                slow = timed(serializer, options['repeat'])
+                fast = timed(rows, options['repeat'])
+                self.stdout.write(
+                    f"{size:>7} products: serializer p50={slow['p50']:8.1f}ms p95={slow['p95']:8.1f}ms | "
+                    f"rows p50={fast['p50']:7.1f}ms p95={fast['p95']:7.1f}ms | "
+                    f"{slow['p50'] / max(fast['p50'], 1e-9):.1f}x"
+                )
+
+            transaction.set_rollback(True)
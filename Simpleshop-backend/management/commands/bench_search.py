@@ -0,0 +1,49 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.models import Product
+from api.search import search_product_ids, suggest_terms, ensure_search_index
+from api.seeding import seed_products
+from api.benchmarking import benchmark_database, timed
+
+QUERIES = ['samsung', 'sams', 'gaming laptop', 'wireless earbuds', 'oled', 'power bank', 'canon dslr', 'bluetooth']
+TYPOS = ['samsnug', 'hedphones', 'lapptop', 'chargr', 'sonny']
+
+
+class Command(BaseCommand):
+    help = "Benchmark FTS5 search vs icontains on a seeded catalog (changes are rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.run(options)
+
+    def run(self, options):
+        with transaction.atomic():
+            ensure_search_index()
+            start = time.perf_counter()
+            seeded = seed_products(options['products'])
+            self.stdout.write(f"Seeded {seeded} products in {time.perf_counter() - start:.1f}s "
+                              f"(catalog size {Product.objects.count()})")
+
+            for query in QUERIES:
+                fts = timed(lambda: search_product_ids(query), options['repeat'])
+                like = timed(lambda: list(
+                    Product.objects.filter(name__icontains=query).values_list('id', flat=True)[:500]
+                ), options['repeat'])
+                self.stdout.write(
+                    f"{query!r:20} fts p50={fts['p50']:.2f}ms p95={fts['p95']:.2f}ms | "
+                    f"icontains p50={like['p50']:.2f}ms p95={like['p95']:.2f}ms"
+                )
+
+            for query in TYPOS:
+                result = timed(lambda: suggest_terms(query), options['repeat'])
+                self.stdout.write(
+                    f"suggest {query!r:12} -> {suggest_terms(query)[:3]} "
+                    f"p50={result['p50']:.2f}ms p95={result['p95']:.2f}ms"
+                )
+
+            transaction.set_rollback(True)
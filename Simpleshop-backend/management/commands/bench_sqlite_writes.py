@@ -0,0 +1,156 @@
+import multiprocessing
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from api.benchmarking import summarize
+
+# The configuration before tuning: rollback journal, deferred BEGIN, Python's 5s default
+BASELINE_OPTIONS = {'init_command': 'PRAGMA journal_mode=DELETE', 'timeout': 5}
+
+
+def _use_database(path, options):
+    connection = connections['default']
+    connection.close()
+    connection.settings_dict['NAME'] = str(path)
+    connection.settings_dict['OPTIONS'] = dict(options)
+
+
+def _worker(role, path, options, iterations, start_event, results):
+    """Runs in a spawned process: checkout / cart / OTP writes, or catalog reads"""
+    import django
+    django.setup()
+    from django.db import OperationalError, transaction
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from api.cart import apply_cart_operations
+    from api.filters import filter_products
+    from api.models import CustomUser, Product, PasswordResetOTP
+    from api.outbox import queue_email
+    from api.views import CreateOrderView
+
+    _use_database(path, options)
+    user = CustomUser.objects.get(email='bench-writes@example.com')
+    products = list(Product.objects.values_list('id', 'price')[:20])
+    factory, view = APIRequestFactory(), CreateOrderView.as_view()
+
+    def checkout(n):
+        pk, price = products[n % len(products)]
+        request = factory.post('/api/orders/create/', {
+            'total_price': str(price), 'is_paid': True,
+            'items': [{'product': pk, 'quantity': 1, 'price': str(price)}],
+        }, format='json')
+        force_authenticate(request, user=user)
+        response = view(request)
+        if response.status_code != 201:
+            raise RuntimeError(response.data)
+
+    def cart(n):
+        apply_cart_operations(user, [{'op': 'add', 'product_id': products[n % len(products)][0], 'quantity': 1}])
+
+    def otp(n):
+        with transaction.atomic():
+            PasswordResetOTP.objects.create(user=user, otp=f'{n % 1000000:06d}')
+            queue_email('OTP', 'body', [user.email])
+
+    def read(n):
+        params = {'category': 'Laptops'} if n % 2 else {}
+        list(filter_products(Product.objects.all(), params).order_by('-id')[:24])
+
+    operation = {'writer': lambda n: (checkout, cart, otp)[n % 3](n), 'reader': read}[role]
+    timings, locked = [], 0
+    start_event.wait()
+    try:
+        for n in range(iterations):
+            start = time.perf_counter()
+            try:
+                operation(n)
+            except OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                locked += 1
+                continue
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        results.put((role, timings, locked))  # the parent waits for every process
+
+
+class Command(BaseCommand):
+    help = (
+        "Multi-process SQLite contention benchmark: concurrent checkout/cart/OTP writers "
+        "and catalog readers, before vs after the WAL / IMMEDIATE tuning"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--iterations', type=int, default=150, help="Operations per process")
+
+    def prepare(self, path, db_options):
+        """Schema and seed data in a fresh database file"""
+        from api.models import CustomUser, Product
+        from api.seeding import build_products
+
+        _use_database(path, db_options)
+        call_command('migrate', run_syncdb=True, verbosity=0)
+        CustomUser.objects.create_user(email='bench-writes@example.com', full_name='Bench')
+        products = list(build_products(500))
+        for product in products:
+            product.stock = 1_000_000
+        Product.objects.bulk_create(products)
+        connections['default'].close()
+
+    def run(self, path, options, workers, iterations):
+        ctx = multiprocessing.get_context('spawn')
+        start_event, results = ctx.Event(), ctx.Queue()
+        processes = [
+            ctx.Process(target=_worker, args=(role, path, options, iterations, start_event, results))
+            for role in workers
+        ]
+        for process in processes:
+            process.start()
+        time.sleep(2)  # let every process finish django.setup()
+
+        began = time.perf_counter()
+        start_event.set()
+        collected = [results.get() for _ in processes]
+        elapsed = time.perf_counter() - began
+        for process in processes:
+            process.join()
+
+        report = {}
+        for role in ('writer', 'reader'):
+            timings = [t for r, ts, _ in collected if r == role for t in ts]
+            summary = summarize(timings)
+            summary['locked'] = sum(locked for r, _, locked in collected if r == role)
+            summary['per_second'] = len(timings) / elapsed
+            report[role] = summary
+        return report
+
+    def handle(self, *args, **options):
+        if settings.DATABASES['default']['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("This benchmark is for the SQLite backend")
+
+        # Copied first: pointing the connection at the scratch files rewrites settings_dict
+        tuned = dict(settings.DATABASES['default']['OPTIONS'])
+        workers = ['writer'] * options['writers'] + ['reader'] * options['readers']
+        tmp = Path(tempfile.mkdtemp(prefix='bench-sqlite-'))
+        try:
+            template = tmp / 'template.sqlite3'
+            self.prepare(template, tuned)
+
+            for name, db_options in [('baseline', BASELINE_OPTIONS), ('tuned', tuned)]:
+                path = tmp / f'{name}.sqlite3'
+                shutil.copy(template, path)
+                report = self.run(path, db_options, workers, options['iterations'])
+                for role, summary in report.items():
+                    self.stdout.write(
+                        f"{name:8} {role}s: {summary['per_second']:7.1f} ops/s "
+                        f"p50={summary['p50']:6.1f}ms p95={summary['p95']:7.1f}ms p99={summary['p99']:7.1f}ms "
+                        f"'database is locked'={summary['locked']}"
+                    )
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
@@ -0,0 +1,65 @@
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction, OperationalError
+from api.inventory import InsufficientStock, decrement_stock
+from api.models import Product
+from api.seeding import build_products
+from api.benchmarking import benchmark_database
+
+
+class Command(BaseCommand):
+    help = "Many parallel buyers hit one hot SKU: report throughput and verify zero oversell"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyers', type=int, default=32)
+        parser.add_argument('--stock', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.run(options)
+
+    def run(self, options):
+        product = next(build_products(1))
+        product.stock = options['stock']
+        product.save()
+
+        sold = []
+        lock_retries = []
+        start = threading.Barrier(options['buyers'] + 1)
+
+        def buyer():
+            start.wait()
+            try:
+                while True:
+                    try:
+                        with transaction.atomic():
+                            decrement_stock({product.id: 1})
+                        sold.append(1)
+                    except InsufficientStock:
+                        return
+                    except OperationalError:  # SQLite: database is locked
+                        lock_retries.append(1)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buyer) for _ in range(options['buyers'])]
+        try:
+            for t in threads:
+                t.start()
+            start.wait()
+            began = time.perf_counter()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - began
+            remaining = Product.objects.values_list('stock', flat=True).get(id=product.id)
+        finally:
+            Product.objects.filter(id=product.id).delete()
+
+        self.stdout.write(
+            f"{len(sold)} units sold to {options['buyers']} buyers in {elapsed:.2f}s "
+            f"({len(sold) / elapsed:.0f} purchases/s, {len(lock_retries)} lock retries), stock left {remaining}"
+        )
+        if len(sold) != options['stock'] or remaining != 0:
+            raise CommandError(f"Oversold or lost stock: sold {len(sold)} of {options['stock']}, {remaining} left")
+        self.stdout.write(self.style.SUCCESS("Zero oversell"))
@@ -0,0 +1,111 @@
+import itertools
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+from api.db_router import REPLICA
+from api.models import CustomUser, Product, CartItem, ProductFacetCount
+from api.views import ProductListView, ProductDetailView, BrandListView, ProductSearchView
+
+
+class Command(BaseCommand):
+    help = (
+        "Check the primary/replica router against a scratch SQLite replica: catalog views "
+        "read the replica, writes and orders/cart stay on the primary, writers stick to it"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--replica', help="Use this database file as the replica instead of a scratch copy")
+
+    def setup_replica(self, path):
+        default = connections['default'].settings_dict
+        connections.settings[REPLICA] = {**default, 'NAME': str(path), 'TEST': {'MIRROR': None}}
+        call_command('migrate', database=REPLICA, run_syncdb=True, verbosity=0)
+
+    def expect(self, label, condition):
+        self.stdout.write(f"{'ok  ' if condition else 'FAIL'} {label}")
+        if not condition:
+            self.failures.append(label)
+
+    def run_checks(self):
+        # Distinct rows on each side show which database answered
+        replica_product = Product.objects.using(REPLICA).create(
+            name='Replica Only Widget', description='replica', price=10, stock=5,
+        )
+        ProductFacetCount.objects.using(REPLICA).create(facet='brand', value='ReplicaBrand', count=1)
+        primary_product = Product.objects.create(name='Primary Only Widget', description='primary', price=10, stock=5)
+        user = CustomUser.objects.create_user(email='router-check@example.com', full_name='Router Check')
+        token = f'Bearer {RefreshToken.for_user(user).access_token}'
+
+        factory = APIRequestFactory()
+
+        def get(view, path, ip, token=None, **kwargs):
+            # Real paths: catalog_cached keys responses by URL
+            headers = {'REMOTE_ADDR': ip, **({'HTTP_AUTHORIZATION': token} if token else {})}
+            response = view(factory.get(path, kwargs.pop('params', {}), **headers), **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+            return response.status_code, json.loads(response.content or b'null')
+
+        probes = itertools.count()
+
+        def listed_names(ip, token=None):
+            # A fresh query string each time, so no answer comes from the catalog cache
+            _, page = get(ProductListView.as_view(), '/api/products/', ip, token, params={'probe': next(probes)})
+            return {p['name'] for p in page['results']}
+
+        self.expect("product list reads the replica", 'Replica Only Widget' in listed_names('10.0.0.1'))
+        status, _ = get(ProductDetailView.as_view(), f'/api/products/{replica_product.id}/', '10.0.0.1',
+                        pk=replica_product.id)
+        self.expect("product detail reads the replica", status == 200)
+        self.expect("brand list reads the replica", 'ReplicaBrand' in get(BrandListView, '/api/brands/', '10.0.0.1')[1])
+        _, found = get(ProductSearchView.as_view(), '/api/products/search/', '10.0.0.1', params={'q': 'replica'})
+        self.expect("search reads the replica", any(p['id'] == replica_product.id for p in found['results']))
+
+        self.expect("writes go to the primary", router.db_for_write(Product) == 'default')
+        self.expect("reads outside catalog views use the primary", router.db_for_read(Product) in (None, 'default'))
+
+        # Through the full middleware stack, so StickyPrimaryMiddleware sees the write
+        writer = Client(REMOTE_ADDR='10.0.0.2')
+        response = writer.post('/api/cart/', {'product_id': primary_product.id, 'quantity': 1},
+                               content_type='application/json', HTTP_AUTHORIZATION=token)
+        self.expect("cart write succeeds on the primary",
+                    response.status_code == 201 and CartItem.objects.filter(user=user).exists())
+        self.expect("cart read-after-write sees the item",
+                    len(writer.get('/api/cart/', HTTP_AUTHORIZATION=token).json()) == 1)
+
+        self.expect("the writer sticks to the primary", 'Primary Only Widget' in listed_names('10.0.0.2'))
+        self.expect("stickiness follows the user to another address",
+                    'Primary Only Widget' in listed_names('10.0.0.3', token))
+        self.expect("other clients keep reading the replica", 'Replica Only Widget' in listed_names('10.0.0.1'))
+
+    def handle(self, *args, **options):
+        tmp = Path(tempfile.mkdtemp(prefix='router-check-'))
+        path = Path(options['replica']) if options['replica'] else tmp / 'replica.sqlite3'
+        self.failures = []
+
+        setup_test_environment()
+        try:
+            self.setup_replica(path)
+            # A private cache: stickiness markers and catalog responses start empty
+            local_cache = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+            with override_settings(CACHES=local_cache), \
+                    transaction.atomic(), transaction.atomic(using=REPLICA):
+                self.run_checks()
+                transaction.set_rollback(True)
+                transaction.set_rollback(True, using=REPLICA)
+        finally:
+            teardown_test_environment()
+            connections[REPLICA].close()
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        if self.failures:
+            raise CommandError(f"{len(self.failures)} router checks failed")
+        self.stdout.write(self.style.SUCCESS("Router checks passed"))
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from rest_framework.test import APIRequestFactory, force_authenticate
+from api.benchmarking import benchmark_database
+from api.models import CustomUser, Product, Order, OrderItem, CartItem
+from api.query_budgets import QUERY_BUDGETS
+from api.seeding import build_products
+from api.views import UserOrdersView, OrderItemsView, CartView, generate_invoice
+
+
+class Command(BaseCommand):
+    help = "Fail if the order history, cart or invoice endpoints exceed their SQL query budget"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=200)
+        parser.add_argument('--items', type=int, default=5, help="Line items per order")
+
+    def seed(self, orders, items_per_order):
+        user = CustomUser.objects.create_user(email='query-budget@example.com', full_name='Budget Check')
+        products = Product.objects.bulk_create(build_products(max(items_per_order, 20)))
+
+        for _ in range(orders):
+            order = Order.objects.create(user=user, total_price=0)
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, quantity=1, price=product.price)
+                for product in products[:items_per_order]
+            ])
+        CartItem.objects.bulk_create([CartItem(user=user, product=p, quantity=2) for p in products])
+        return user
+
+    def measure(self, user):
+        factory = APIRequestFactory()
+        last_order = Order.objects.filter(user=user).first()
+        calls = {
+            'order-history': (UserOrdersView.as_view(), factory.get('/api/orders/'), {}),
+            'order-history-summary': (UserOrdersView.as_view(), factory.get('/api/orders/', {'view': 'summary'}), {}),
+            'order-items': (OrderItemsView.as_view(), factory.get(f'/api/orders/{last_order.id}/items/'),
+                            {'order_id': last_order.id}),
+            'cart': (CartView.as_view(), factory.get('/api/cart/'), {}),
+            'invoice': (generate_invoice, factory.get(f'/invoice/{last_order.id}/'), {'order_id': last_order.id}),
+        }
+
+        counts = {}
+        for name, (view, request, kwargs) in calls.items():
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as queries:
+                response = view(request, **kwargs)
+                if hasattr(response, 'render'):
+                    response.render()
+            counts[name] = len(queries)
+        return counts
+
+    def handle(self, *args, **options):
+        # The factory's 'testserver' host is only allowed in the test environment
+        setup_test_environment()
+        try:
+            # A throwaway test database: the seed never lands in, or locks, the configured one
+            with benchmark_database():
+                user = self.seed(options['orders'], options['items'])
+                counts = self.measure(user)
+        finally:
+            teardown_test_environment()
+
+        failures = []
+        for name, count in counts.items():
+            budget = QUERY_BUDGETS[name]
+            status = 'ok' if count <= budget else 'OVER BUDGET'
+            self.stdout.write(f"{name:15} {count:3} queries (budget {budget}) {status}")
+            if count > budget:
+                failures.append(name)
+
+        if failures:
+            raise CommandError(f"Query budget exceeded: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("All endpoints within their query budget"))
@@ -0,0 +1,38 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from api.invoices import invoice_orders, iter_invoice_zip, orders_created_between
+
+
+class Command(BaseCommand):
+    help = "Write the invoices for a date range or a list of order ids to a ZIP file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Path of the ZIP file to write")
+        parser.add_argument('--ids', type=int, nargs='+')
+        parser.add_argument('--start', help="YYYY-MM-DD")
+        parser.add_argument('--end', help="YYYY-MM-DD")
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Render processes")
+
+    def handle(self, *args, **options):
+        orders = invoice_orders()
+        if options['ids']:
+            orders = orders.filter(id__in=options['ids']).order_by('id')
+        elif options['start'] and options['end']:
+            start, end = parse_date(options['start']), parse_date(options['end'])
+            if not start or not end:
+                raise CommandError("--start and --end must be YYYY-MM-DD dates")
+            orders = orders_created_between(orders, start, end)
+        else:
+            raise CommandError("Pass either --ids or --start and --end")
+
+        # A pool sized to every core, separate from the web request pool
+        with ProcessPoolExecutor(max_workers=options['workers'],
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            with open(options['output'], 'wb') as out:
+                for chunk in iter_invoice_zip(orders, pool):
+                    out.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
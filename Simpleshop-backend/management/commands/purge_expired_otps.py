@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+from api.models import PasswordResetOTP, RateLimitCounter
+
+
+class Command(BaseCommand):
+    help = "Delete password reset OTPs and rate-limit counters past their expiry (run from cron or with --loop)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--loop', action='store_true', help="Keep running instead of a single pass")
+        parser.add_argument('--interval', type=float, default=300.0, help="Seconds between passes in --loop mode")
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = PasswordResetOTP.purge_expired(options['batch_size'])
+            if deleted:
+                self.stdout.write(f"Deleted {deleted} expired OTPs")
+            deleted = RateLimitCounter.purge_expired(options['batch_size'])
+            if deleted:
+                self.stdout.write(f"Deleted {deleted} expired rate-limit counters")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
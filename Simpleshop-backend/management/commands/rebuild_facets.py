@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api.facets import rebuild_facet_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute the ProductFacetCount summary table from Product (after bulk imports)"
+
+    def handle(self, *args, **options):
+        rows = rebuild_facet_counts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} facet counts"))
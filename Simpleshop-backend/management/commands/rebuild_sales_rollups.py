@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from api.sales import rebuild_sales_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily sales rollups from orders (backfills, bulk imports, edited "
+        "or deleted orders), for every day or a --start / --end range"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help="First day to rebuild (YYYY-MM-DD)")
+        parser.add_argument('--end', help="Last day to rebuild (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        days = {}
+        for name in ('start', 'end'):
+            if options[name]:
+                days[name] = parse_date(options[name])
+                if days[name] is None:
+                    raise CommandError(f"--{name} must be a YYYY-MM-DD date")
+        rows = rebuild_sales_rollups(days.get('start'), days.get('end'))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} sales rollup rows"))
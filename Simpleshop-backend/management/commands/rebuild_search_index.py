@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from api.search import ensure_search_index, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Create (if missing) and fully rebuild the FTS5 product search index"
+
+    def handle(self, *args, **options):
+        ensure_search_index()
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS("Product search index rebuilt"))
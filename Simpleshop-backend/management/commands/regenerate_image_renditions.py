@@ -0,0 +1,54 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from django.core.management.base import BaseCommand
+from api.images import submit_renditions
+from api.models import Product
+
+
+class Command(BaseCommand):
+    help = "Render the WebP/JPEG image renditions for the whole catalog in a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', type=int, nargs='+', help="Only these products")
+        parser.add_argument('--force', action='store_true', help="Re-render renditions that already exist")
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Render processes")
+
+    def handle(self, *args, **options):
+        products = Product.objects.exclude(image='').exclude(image__isnull=True).only('id', 'image').order_by('id')
+        if options['ids']:
+            products = products.filter(id__in=options['ids'])
+
+        rendered = skipped = failed = 0
+        start = time.perf_counter()
+        # Bounded in-flight work: the catalog may be far larger than the pool
+        max_pending = options['workers'] * 4
+        pending = {}
+
+        def collect(done):
+            nonlocal rendered, failed
+            for future in done:
+                product_id = pending.pop(future)
+                if future.exception() is None:
+                    rendered += 1
+                else:
+                    failed += 1
+                    self.stderr.write(f"Product {product_id}: {future.exception()}")
+
+        with ProcessPoolExecutor(max_workers=options['workers'],
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            for product in products.iterator(chunk_size=2000):
+                future = submit_renditions(product, pool=pool, force=options['force'])
+                if future is None:
+                    skipped += 1
+                    continue
+                pending[future] = product.id
+                if len(pending) >= max_pending:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            collect(wait(pending).done)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {rendered} products, {skipped} already complete, {failed} failed "
+            f"in {time.perf_counter() - start:.1f}s"
+        ))
@@ -0,0 +1,20 @@
+import time
+from django.core.management.base import BaseCommand
+from api.inventory import release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = "Return stock held by expired (abandoned) checkout reservations"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep running instead of a single pass")
+        parser.add_argument('--interval', type=float, default=60.0, help="Seconds between passes in --loop mode")
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_expired_reservations()
+            if released:
+                self.stdout.write(f"Released {released} expired reservations")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,211 @@
+import json
+import random
+import subprocess
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+from api.benchmarking import summarize
+from api.models import CustomUser, Product, Order
+from api.seeding import LOAD_TEST_EMAIL_DOMAIN
+
+LIST_QUERIES = [
+    {},
+    {'sort': 'price'},
+    {'sort': '-rating'},
+    {'category': 'Laptops', 'sort': 'price'},
+    {'brand': 'Samsung'},
+    {'min_price': 1000, 'max_price': 50000, 'in_stock': 'true'},
+]
+
+
+# Each scenario: fn(session, worker) -> requests.Response
+def product_list(session, worker):
+    return session.get(worker.url('/api/products/'), params=worker.rng.choice(LIST_QUERIES))
+
+
+def product_detail(session, worker):
+    return session.get(worker.url(f'/api/products/{worker.rng.choice(worker.product_ids)}/'))
+
+
+def cart_view(session, worker):
+    return session.get(worker.url('/api/cart/'))
+
+
+def cart_add(session, worker):
+    return session.post(worker.url('/api/cart/'), json={
+        'product_id': worker.rng.choice(worker.product_ids), 'quantity': 1,
+    })
+
+
+def checkout(session, worker):
+    lines = worker.rng.sample(worker.in_stock, worker.rng.randint(1, 3))
+    return session.post(worker.url('/api/orders/create/'), json={
+        'address': worker.address_id,
+        'total_price': str(sum(price for _, price in lines)),
+        'is_paid': True,
+        'items': [{'product': pk, 'quantity': 1, 'price': str(price)} for pk, price in lines],
+    })
+
+
+def order_history(session, worker):
+    # What MyOrders.js loads: the first summary page
+    return session.get(worker.url('/api/orders/'), params={'view': 'summary'})
+
+
+def invoice(session, worker):
+    return session.get(worker.url(f'/invoice/{worker.rng.choice(worker.order_ids)}/'))
+
+
+SCENARIOS = {
+    'product-list': product_list,
+    'product-detail': product_detail,
+    'cart': cart_view,
+    'cart-add': cart_add,
+    'checkout': checkout,
+    'order-history': order_history,
+    'invoice': invoice,
+}
+
+
+class Worker:
+    """One simulated customer: a logged-in session plus the ids it picks from"""
+
+    def __init__(self, base_url, user, seed, product_ids, in_stock):
+        self.base_url = base_url.rstrip('/')
+        self.rng = random.Random(seed)
+        self.product_ids = product_ids
+        self.in_stock = in_stock
+        self.address_id = user.useraddress_set.values_list('id', flat=True).first()
+        self.order_ids = list(Order.objects.filter(user=user).values_list('id', flat=True)[:50])
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+
+    def url(self, path):
+        return self.base_url + path
+
+
+def git_revision():
+    try:
+        sha = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+        dirty = bool(subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'], text=True).strip())
+        return sha, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the catalog, cart, checkout, order history and invoice endpoints of a "
+        "running server concurrently; report p50/p95/p99 and RPS and save them as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--duration', type=float, default=30.0, help="Measured seconds per scenario")
+        parser.add_argument('--warmup', type=float, default=3.0, help="Unmeasured seconds per scenario")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help="Results file (default: loadtest-results/<time>-<commit>.json)")
+        parser.add_argument('--compare', help="Earlier results file to compare against")
+
+    def make_workers(self, options):
+        users = list(
+            CustomUser.objects.filter(email__endswith=f'@{LOAD_TEST_EMAIL_DOMAIN}', order__isnull=False)
+            .distinct().order_by('id')[:options['concurrency']]
+        )
+        if len(users) < options['concurrency']:
+            raise CommandError("Not enough seeded users with orders: run seed_load_data first")
+
+        rng = random.Random(options['seed'])
+        all_ids = list(Product.objects.values_list('id', flat=True))
+        product_ids = rng.sample(all_ids, min(len(all_ids), 5000))
+        in_stock = list(Product.objects.filter(stock__gt=0).values_list('id', 'price')[:5000])
+        return [
+            Worker(options['base_url'], user, options['seed'] + n, product_ids, in_stock)
+            for n, user in enumerate(users)
+        ]
+
+    def run_scenario(self, fn, workers, warmup, duration):
+        timings, statuses, lock = [], Counter(), threading.Lock()
+        measure_from = time.perf_counter() + warmup
+        stop_at = measure_from + duration
+
+        def loop(worker):
+            local_timings, local_statuses = [], Counter()
+            while True:
+                start = time.perf_counter()
+                if start >= stop_at:
+                    break
+                try:
+                    status = fn(worker.session, worker).status_code
+                except requests.RequestException:
+                    status = 'connection-error'
+                if start >= measure_from:
+                    local_timings.append((time.perf_counter() - start) * 1000)
+                    local_statuses[status] += 1
+            with lock:
+                timings.extend(local_timings)
+                statuses.update(local_statuses)
+
+        with ThreadPoolExecutor(max_workers=len(workers)) as pool:
+            list(pool.map(loop, workers))
+
+        result = summarize(timings)
+        result['rps'] = len(timings) / duration
+        result['errors'] = sum(n for status, n in statuses.items() if status == 'connection-error' or status >= 400)
+        result['statuses'] = {str(status): n for status, n in sorted(statuses.items(), key=str)}
+        return result
+
+    def compare(self, results, path):
+        previous = json.loads(Path(path).read_text())
+        self.stdout.write(f"\nvs {previous['commit']} ({previous['timestamp']}):")
+        for name, result in results.items():
+            before = previous['results'].get(name)
+            if not before:
+                continue
+
+            def change(key):
+                return (result[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+
+            self.stdout.write(
+                f"{name:15} p95 {before['p95']:8.1f} -> {result['p95']:8.1f}ms ({change('p95'):+.0f}%)  "
+                f"rps {before['rps']:7.1f} -> {result['rps']:7.1f} ({change('rps'):+.0f}%)"
+            )
+
+    def handle(self, *args, **options):
+        workers = self.make_workers(options)
+        results = {}
+        for name in options['scenarios']:
+            result = self.run_scenario(SCENARIOS[name], workers, options['warmup'], options['duration'])
+            results[name] = result
+            self.stdout.write(
+                f"{name:15} p50={result['p50']:7.1f}ms p95={result['p95']:7.1f}ms p99={result['p99']:7.1f}ms "
+                f"rps={result['rps']:7.1f} errors={result['errors']}"
+            )
+
+        sha, dirty = git_revision()
+        timestamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+        report = {
+            'commit': sha + ('-dirty' if dirty else ''),
+            'timestamp': timestamp,
+            'base_url': options['base_url'],
+            'concurrency': options['concurrency'],
+            'duration': options['duration'],
+            'seed': options['seed'],
+            'results': results,
+        }
+        output = Path(options['output'] or settings.BASE_DIR / 'loadtest-results' / f'{timestamp}-{report["commit"]}.json')
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+        if options['compare']:
+            self.compare(results, options['compare'])
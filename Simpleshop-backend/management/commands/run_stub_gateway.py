@@ -0,0 +1,64 @@
+import json
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local stand-in for the Razorpay orders API "
+        "(set RAZORPAY_BASE_URL=http://127.0.0.1:<port>) with optional latency and failures"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=9009)
+        parser.add_argument('--delay', type=float, default=0.0, help="Seconds to sleep before answering")
+        parser.add_argument('--fail-rate', type=float, default=0.0, help="Fraction of requests answered with a 500")
+
+    def handle(self, *args, **options):
+        stdout = self.stdout
+
+        class Handler(BaseHTTPRequestHandler):
+            created = 0
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if not self.path.rstrip('/').endswith('/orders'):
+                    return self._reply(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "Not found"}})
+
+                time.sleep(options['delay'])
+                if random.random() < options['fail_rate']:
+                    return self._reply(500, {"error": {"code": "SERVER_ERROR", "description": "Stub failure"}})
+
+                Handler.created += 1
+                self._reply(200, {
+                    "id": f"order_stub{uuid.uuid4().hex[:14]}",
+                    "entity": "order",
+                    "amount": payload.get("amount"),
+                    "currency": payload.get("currency", "INR"),
+                    "status": "created",
+                    "created_at": int(time.time()),
+                })
+
+            def log_message(self, format, *args):
+                stdout.write(f"[stub gateway] {format % args} (orders created: {Handler.created})")
+
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), Handler)
+        self.stdout.write(f"Stub gateway listening on http://127.0.0.1:{options['port']}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
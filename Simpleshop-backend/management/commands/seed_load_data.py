@@ -0,0 +1,54 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.models import Product
+from api.facets import rebuild_facet_counts
+from api.sales import rebuild_sales_rollups
+from api.seeding import seed_products, seed_users, seed_orders, LOAD_TEST_PASSWORD
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed load-test volumes with bulk_create: products across every category and "
+        "brand, users with addresses, and orders with their line items"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100_000)
+        parser.add_argument('--users', type=int, default=50_000)
+        # ~3 lines per order: 250k orders + ~750k items is about 1M order rows
+        parser.add_argument('--orders', type=int, default=250_000)
+        parser.add_argument('--days', type=int, default=365, help="Spread order dates over this many days")
+        parser.add_argument('--seed', type=int, default=42, help="Same seed, same data")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def step(self, label, fn):
+        start = time.perf_counter()
+        result = fn()
+        self.stdout.write(f"{label}: {time.perf_counter() - start:.1f}s")
+        return result
+
+    def handle(self, *args, **options):
+        seed, batch_size = options['seed'], options['batch_size']
+
+        with transaction.atomic():
+            self.step(f"{options['products']} products",
+                      lambda: seed_products(options['products'], seed, batch_size))
+            self.step("facet counts", rebuild_facet_counts)
+
+        with transaction.atomic():
+            users = self.step(f"{options['users']} users + addresses",
+                              lambda: seed_users(options['users'], seed, batch_size))
+
+        products = list(Product.objects.values_list('id', 'price'))
+        with transaction.atomic():
+            items = self.step(f"{options['orders']} orders",
+                              lambda: seed_orders(options['orders'], users, products, seed,
+                                                  options['days'], batch_size))
+            # bulk_create skips the order-creation path that maintains the rollups
+            self.step("sales rollups", rebuild_sales_rollups)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {options['orders']} orders with {items} items. "
+            f"Users log in as user<N>@loadtest.example.com / {LOAD_TEST_PASSWORD}"
+        ))
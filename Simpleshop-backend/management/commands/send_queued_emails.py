@@ -0,0 +1,57 @@
+import time
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from api.outbox import deliver_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver queued OutboxEmail rows over a single reused SMTP connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of exiting when the queue is empty")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds between polls in --loop mode")
+        # Point the worker at a local SMTP stand-in, e.g. `python -m aiosmtpd -n -l localhost:1025`
+        parser.add_argument('--smtp-host')
+        parser.add_argument('--smtp-port', type=int)
+        parser.add_argument('--no-tls', action='store_true')
+
+    def get_connection(self, options):
+        overrides = {}
+        if options['smtp_host']:
+            overrides['host'] = options['smtp_host']
+        if options['smtp_port']:
+            overrides['port'] = options['smtp_port']
+        if options['no_tls']:
+            overrides['use_tls'] = False
+            overrides['username'] = ''
+            overrides['password'] = ''
+        return get_connection(fail_silently=False, **overrides)
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        connection = self.get_connection(options)
+
+        while True:
+            try:
+                connection.open()
+                sent, failed = deliver_batch(connection, options['batch_size'])
+            except OSError as e:
+                # SMTP server unreachable: the claimed rows are retried once their lease expires
+                self.stderr.write(f"SMTP connection failed: {e}")
+                sent = failed = 0
+                time.sleep(options['interval'])
+
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Batch: {sent} sent, {failed} failed")
+                continue  # more may be due right away
+            if not options['loop']:
+                break
+            # Idle: drop the SMTP session instead of holding it open between polls
+            connection.close()
+            time.sleep(options['interval'])
+
+        connection.close()
+        self.stdout.write(self.style.SUCCESS(f"Done: {total_sent} sent, {total_failed} failed"))
@@ -0,0 +1,57 @@
+import threading
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, OperationalError
+from api.cart import apply_cart_operations
+from api.models import CustomUser, Product, CartItem
+from api.seeding import build_products
+from api.benchmarking import benchmark_database
+
+
+class Command(BaseCommand):
+    help = "Add the same product to one cart from many threads at once and verify no increment is lost"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--adds', type=int, default=50, help="Adds per thread")
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.run(options)
+
+    def run(self, options):
+        user = CustomUser.objects.create_user(email='stress-cart@example.com', full_name='Stress')
+        product = next(build_products(1))
+        product.save()
+        gave_up = []
+        start = threading.Barrier(options['threads'])
+
+        def worker():
+            start.wait()
+            try:
+                for _ in range(options['adds']):
+                    for attempt in range(20):
+                        try:
+                            apply_cart_operations(user, [{'op': 'add', 'product_id': product.id, 'quantity': 1}])
+                            break
+                        except OperationalError:  # SQLite: database is locked
+                            if attempt == 19:
+                                gave_up.append(1)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            quantity = CartItem.objects.get(user=user, product=product).quantity
+        finally:
+            user.delete()
+            Product.objects.filter(id=product.id).delete()
+
+        expected = options['threads'] * options['adds'] - len(gave_up)
+        self.stdout.write(f"Final quantity {quantity}, expected {expected} ({len(gave_up)} adds gave up on lock errors)")
+        if quantity != expected:
+            raise CommandError(f"Lost {expected - quantity} increments")
+        self.stdout.write(self.style.SUCCESS("No lost increments"))
@@ -0,0 +1,60 @@
+import threading
+from collections import Counter
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, OperationalError
+from api.models import CustomUser, Order
+from api.benchmarking import benchmark_database
+
+
+class Command(BaseCommand):
+    help = "Create orders for one user from many threads at once and verify order numbers are unique"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--orders', type=int, default=25, help="Orders per thread")
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.run(options)
+
+    def run(self, options):
+        user = CustomUser.objects.create_user(email='stress-order-numbers@example.com', full_name='Stress')
+        errors = []
+        start = threading.Barrier(options['threads'])
+
+        def worker():
+            start.wait()
+            try:
+                for _ in range(options['orders']):
+                    for attempt in range(20):
+                        try:
+                            Order.objects.create(user=user, total_price=0)
+                            break
+                        except OperationalError as e:  # SQLite: database is locked
+                            if attempt == 19:
+                                errors.append(str(e))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            numbers = list(Order.objects.filter(user=user).values_list('user_order_number', flat=True))
+            duplicates = {n: c for n, c in Counter(numbers).items() if c > 1}
+            expected = options['threads'] * options['orders'] - len(errors)
+            self.stdout.write(
+                f"{len(numbers)} orders created ({len(errors)} gave up on lock errors), "
+                f"numbers {min(numbers, default=0)}..{max(numbers, default=0)}"
+            )
+        finally:
+            user.delete()
+
+        if duplicates:
+            raise CommandError(f"Duplicate order numbers: {duplicates}")
+        if sorted(numbers) != list(range(1, expected + 1)):
+            raise CommandError("Order numbers are not a gapless 1..N sequence")
+        self.stdout.write(self.style.SUCCESS("No duplicate order numbers"))
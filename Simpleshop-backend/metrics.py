@@ -0,0 +1,151 @@
+# api/metrics.py
+import contextvars
+import json
+import logging
+import os
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest, multiprocess
+
+# With several workers (gunicorn), set PROMETHEUS_MULTIPROC_DIR to a directory
+# shared by them before start-up; each worker writes its samples there and
+# /metrics merges them. Call multiprocess.mark_process_dead(worker.pid) from
+# gunicorn's child_exit hook so gauges of dead workers are dropped.
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', "Request latency by route",
+    ['route', 'method', 'status'],
+)
+SQL_QUERIES = Histogram(
+    'http_request_sql_queries', "SQL statements per request",
+    ['route', 'method'], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+SQL_DURATION = Histogram(
+    'http_request_sql_duration_seconds', "Time spent in SQL per request",
+    ['route', 'method'],
+)
+SERIALIZER_DURATION = Histogram(
+    'http_request_serializer_duration_seconds', "Time spent serializing output per request",
+    ['route', 'method'],
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', "Response body size",
+    ['route', 'method'], buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+# Routes not worth recording (the scrape itself)
+UNTRACKED_ROUTES = {'metrics/'}
+
+_request_stats = contextvars.ContextVar('request_stats', default=None)
+_serializing = contextvars.ContextVar('serializing', default=False)
+
+logger = logging.getLogger('api.events')
+
+
+def log_event(event, level=logging.INFO, sample_rate=1.0, **fields):
+    """
+    One JSON line per event. Routine events pass a sample_rate < 1 so busy
+    endpoints don't flood the logs; warnings and errors should keep 1.0.
+    """
+    if sample_rate < 1.0 and random.random() >= sample_rate:
+        return
+    if not logger.isEnabledFor(level):
+        return
+    payload = {'event': event, **fields}
+    if sample_rate < 1.0:
+        payload['sample_rate'] = sample_rate
+    logger.log(level, json.dumps(payload, default=str, separators=(',', ':')))
+
+
+@contextmanager
+def serialization_timer():
+    """Adds the block's time to the request's serializer time (nested blocks count once)"""
+    stats = _request_stats.get()
+    if stats is None or _serializing.get():
+        yield
+        return
+    token = _serializing.set(True)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats['serializer_time'] += time.perf_counter() - start
+        _serializing.reset(token)
+
+
+class TimedSerializerMixin:
+    """Adds the outermost serializer's to_representation time to the request's metrics"""
+
+    def to_representation(self, instance):
+        with serialization_timer():
+            return super().to_representation(instance)
+
+
+class MetricsMiddleware:
+    """Per-route latency, SQL count/time, serializer time and response size"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = {'queries': 0, 'sql_time': 0.0, 'serializer_time': 0.0}
+        token = _request_stats.set(stats)
+
+        def count_sql(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats['queries'] += 1
+                stats['sql_time'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(count_sql))
+                response = self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        # The route pattern, not the path: /api/products/42/ and /43/ share a series
+        route = match.route if match else 'unmatched'
+        if route in UNTRACKED_ROUTES:
+            return response
+
+        method = request.method
+        REQUEST_LATENCY.labels(route, method, response.status_code).observe(elapsed)
+        SQL_QUERIES.labels(route, method).observe(stats['queries'])
+        SQL_DURATION.labels(route, method).observe(stats['sql_time'])
+        SERIALIZER_DURATION.labels(route, method).observe(stats['serializer_time'])
+        if not response.streaming:
+            RESPONSE_SIZE.labels(route, method).observe(len(response.content))
+
+        slow = elapsed >= settings.SLOW_REQUEST_SECONDS
+        log_event(
+            'request', level=logging.WARNING if slow else logging.INFO,
+            sample_rate=1.0 if slow else settings.LOG_EVENT_SAMPLE_RATE,
+            route=route, method=method, status=response.status_code,
+            duration_ms=round(elapsed * 1000, 2), queries=stats['queries'],
+            sql_ms=round(stats['sql_time'] * 1000, 2),
+            serializer_ms=round(stats['serializer_time'] * 1000, 2),
+        )
+        return response
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, merged across workers in multiprocess mode"""
+    if settings.METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {settings.METRICS_TOKEN}':
+        return HttpResponse(status=403)
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
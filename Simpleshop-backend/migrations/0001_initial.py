@@ -0,0 +1,121 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('image', models.ImageField(blank=True, null=True, upload_to='product_images/')),
+                ('category', models.CharField(choices=[('Smartphones', 'Smartphones'), ('Laptops', 'Laptops'), ('Smart TVs', 'Smart TVs'), ('Smart Watches & Wearables', 'Smart Watches & Wearables'), ('Audio Devices', 'Audio Devices'), ('Cameras & Photography', 'Cameras & Photography'), ('Smart Home Appliances', 'Smart Home Appliances'), ('Printers & Mouse', 'Printers & Mouse'), ('Chargers & Power Banks', 'Chargers & Power Banks')], default='Smartphones', max_length=100)),
+                ('brand', models.CharField(choices=[('Apple', 'Apple'), ('Samsung', 'Samsung'), ('OnePlus', 'OnePlus'), ('Xiaomi', 'Xiaomi'), ('Realme', 'Realme'), ('Motorola', 'Motorola'), ('Sony', 'Sony'), ('LG', 'LG'), ('HP', 'HP'), ('Dell', 'Dell'), ('Lenovo', 'Lenovo'), ('Asus', 'Asus'), ('Acer', 'Acer'), ('MSI', 'MSI'), ('Canon', 'Canon'), ('Nikon', 'Nikon'), ('Boat', 'Boat'), ('JBL', 'JBL'), ('Philips', 'Philips'), ('Panasonic', 'Panasonic'), ('Amazon', 'Amazon'), ('Google', 'Google'), ('Nothing', 'Nothing'), ('Fire-Boltt', 'Fire-Boltt'), ('Noise', 'Noise'), ('RealWear', 'RealWear'), ('DJI', 'DJI'), ('Fitbit', 'Fitbit'), ('Garmin', 'Garmin'), ('Haier', 'Haier'), ('Logitech', 'Logitech'), ('Prestige', 'Prestige'), ('Morphy Richards', 'Morphy Richards'), ('TCL', 'TCL'), ('Amazfit', 'Amazfit'), ('Sennheiser', 'Sennheiser'), ('GoPro', 'GoPro'), ('Fujifilm', 'Fujifilm'), ('Insta360', 'Insta360'), ('Wipro', 'Wipro'), ('Epson', 'Epson')], default='Sony', max_length=100)),
+                ('stock', models.IntegerField(default=0)),
+                ('rating', models.FloatField(default=0.0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CustomUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('full_name', models.CharField(max_length=255)),
+                ('is_active', models.BooleanField(default=True)),
+                ('is_staff', models.BooleanField(default=False)),
+                ('groups', models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups')),
+                ('user_permissions', models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Order',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('is_paid', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('razorpay_order_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('razorpay_payment_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('razorpay_signature', models.CharField(blank=True, max_length=255, null=True)),
+                ('user_order_number', models.PositiveIntegerField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PasswordResetOTP',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('otp', models.CharField(max_length=6)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('is_used', models.BooleanField(default=False)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='api.order')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.product')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserAddress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('mobile_number', models.CharField(max_length=10)),
+                ('alternate_mobile_number', models.CharField(blank=True, max_length=10, null=True)),
+                ('address', models.TextField()),
+                ('locality', models.CharField(max_length=255)),
+                ('city', models.CharField(max_length=100)),
+                ('state', models.CharField(max_length=100)),
+                ('pincode', models.CharField(max_length=10)),
+                ('landmark', models.CharField(blank=True, max_length=255, null=True)),
+                ('country', models.CharField(default='India', max_length=100)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='address',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='api.useraddress'),
+        ),
+        migrations.CreateModel(
+            name='CartItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('added_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cart_items', to=settings.AUTH_USER_MODEL)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.product')),
+            ],
+            options={
+                'unique_together': {('user', 'product')},
+            },
+        ),
+    ]
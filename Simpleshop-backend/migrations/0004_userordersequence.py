@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_order_numbers(apps, schema_editor):
+    # Same pass as the backfill_order_numbers command, run before the
+    # constraint is added: orders without a number, or sharing one with an
+    # older order of the same user, get the next free number
+    Order = apps.get_model('api', 'Order')
+    UserOrderSequence = apps.get_model('api', 'UserOrderSequence')
+    db_alias = schema_editor.connection.alias
+
+    orders_by_user = Order.objects.using(db_alias)
+    user_ids = orders_by_user.order_by().values_list('user_id', flat=True).distinct()
+    for user_id in user_ids.iterator():
+        orders = list(
+            orders_by_user.filter(user_id=user_id)
+            .order_by('created_at', 'id')
+            .values_list('id', 'user_order_number')
+        )
+        last_number = max((number or 0 for _, number in orders), default=0)
+        seen = set()
+        for order_id, number in orders:
+            if number and number not in seen:
+                seen.add(number)
+                continue
+            last_number += 1
+            orders_by_user.filter(id=order_id).update(user_order_number=last_number)
+            seen.add(last_number)
+
+        UserOrderSequence.objects.using(db_alias).update_or_create(
+            user_id=user_id, defaults={'last_number': last_number}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_productfacetcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserOrderSequence',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='order_sequence', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('last_number', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_order_numbers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.UniqueConstraint(fields=('user', 'user_order_number'), name='unique_user_order_number'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:16
+
+import api.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_stockreservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='passwordresetotp',
+            name='expires_at',
+            field=models.DateTimeField(default=api.models.otp_expiry),
+        ),
+        migrations.AddIndex(
+            model_name='passwordresetotp',
+            index=models.Index(fields=['user', 'otp', 'is_used', 'expires_at'], name='otp_lookup_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordresetotp',
+            index=models.Index(fields=['expires_at'], name='otp_expiry_idx'),
+        ),
+        migrations.CreateModel(
+            name='RateLimitCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('identity', models.CharField(max_length=320)),
+                ('slot', models.BigIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='ratelimit_expiry_idx')],
+                'constraints': [models.UniqueConstraint(fields=('identity', 'slot'), name='ratelimit_slot_key')],
+            },
+        ),
+    ]
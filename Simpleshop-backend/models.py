@@ -1,5 +1,9 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
+from django.conf import settings
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from datetime import timedelta
 import random
 
 # Create your models here.
@@ -101,9 +105,55 @@ class Product(models.Model):
     stock = models.IntegerField(default=0)
     rating = models.FloatField(default=0.0)
 
+    class Meta:
+        # Composite (filter, sort, id) indexes back the catalog filters and
+        # the keyset pagination in ProductListView
+        indexes = [
+            models.Index(fields=['category', 'price', 'id'], name='product_category_price_idx'),
+            models.Index(fields=['brand', 'price', 'id'], name='product_brand_price_idx'),
+            models.Index(fields=['price', 'id'], name='product_price_idx'),
+            models.Index(fields=['rating', 'id'], name='product_rating_idx'),
+            models.Index(fields=['name', 'id'], name='product_name_idx'),
+        ]
+
     def __str__(self):
         return self.name
-    
+
+# Global facet counts (brand / category / rating bucket / availability),
+# kept current by the Product signals in signals.py
+class ProductFacetCount(models.Model):
+    facet = models.CharField(max_length=20)
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('facet', 'value')
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
+
+# Daily sales per category x brand, kept current in the order-creation
+# transaction (see api/sales.py). '' in category / brand means "all", so each
+# day also has per-category, per-brand and whole-day rows with exact order counts.
+class DailySalesRollup(models.Model):
+    ALL = ''
+
+    day = models.DateField()
+    category = models.CharField(max_length=100, blank=True)
+    brand = models.CharField(max_length=100, blank=True)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the index behind date-range reads
+            models.UniqueConstraint(fields=['day', 'category', 'brand'], name='sales_rollup_day_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.category or '*'} / {self.brand or '*'}: {self.revenue}"
+
 class UserAddress(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
@@ -120,6 +170,30 @@ class UserAddress(models.Model):
     def __str__(self):
         return f"{self.name}, {self.address}, {self.city} - {self.pincode}"
     
+# Per-user order number counter: one row per user, bumped atomically inside
+# the order's transaction so numbering is O(1) and never hands out duplicates
+class UserOrderSequence(models.Model):
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True, related_name='order_sequence')
+    last_number = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def next_number(cls, user):
+        """Allocate the user's next order number; call inside transaction.atomic()"""
+        updated = cls.objects.filter(user=user).update(last_number=F('last_number') + 1)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    cls.objects.create(user=user, last_number=1)
+                return 1
+            except IntegrityError:
+                # Another checkout created the row first; fall through to the increment
+                cls.objects.filter(user=user).update(last_number=F('last_number') + 1)
+        # The UPDATE holds the row (SQLite: database) write lock until commit
+        return cls.objects.filter(user=user).values_list('last_number', flat=True).get()
+
+    def __str__(self):
+        return f"{self.user.email}: {self.last_number}"
+
 class Order(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     address = models.ForeignKey(UserAddress, on_delete=models.SET_NULL, null=True)
@@ -135,13 +209,29 @@ class Order(models.Model):
     # NEW: per-user order number
     user_order_number = models.PositiveIntegerField(null=True, blank=True)
 
+    # Paid, but some lines found no stock left (OrderItem.backordered): staff
+    # refund or backorder them instead of the payment being left without an order
+    stock_shortfall = models.BooleanField(default=False)
+
     class Meta:
-        ordering = ['-created_at']
+        # No default ordering: querysets that need an order ask for it, so
+        # lookups and aggregates don't pay for a sort
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'user_order_number'], name='unique_user_order_number'),
+        ]
+        indexes = [
+            # Order history: user_id = ? ORDER BY created_at DESC, straight off the index
+            models.Index(fields=['user', 'created_at'], name='order_user_created_idx'),
+            # Staff invoice export by date range
+            models.Index(fields=['created_at'], name='order_created_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.user_order_number:
-            last_number = Order.objects.filter(user=self.user).count()
-            self.user_order_number = last_number + 1
+            with transaction.atomic():
+                self.user_order_number = UserOrderSequence.next_number(self.user)
+                super().save(*args, **kwargs)
+            return
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -156,17 +246,132 @@ class OrderItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
+    backordered = models.BooleanField(default=False)  # no stock was taken for this line
+
+# Stock held for a checkout between starting payment and placing the order.
+# Product.stock is already decremented; expired rows give it back.
+class StockReservation(models.Model):
+    ACTIVE = 'active'
+    CONSUMED = 'consumed'
+    RELEASED = 'released'
+    STATUS_CHOICES = [
+        (ACTIVE, 'Active'),
+        (CONSUMED, 'Consumed'),
+        (RELEASED, 'Released'),
+    ]
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField()
+    reference = models.CharField(max_length=255)  # payment gateway order id
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=ACTIVE)
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True, blank=True)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='reservation_expiry_idx'),
+            models.Index(fields=['user', 'reference'], name='reservation_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} x {self.quantity} for {self.reference} ({self.status})"
+
+def otp_expiry():
+    return timezone.now() + timedelta(minutes=settings.OTP_VALIDITY_MINUTES)
 
 # Password Reset OTP Model
 class PasswordResetOTP(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     otp = models.CharField(max_length=6)
     created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(default=otp_expiry)
     is_used = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Verification is a single index probe on (user, otp, is_used, expires_at)
+            models.Index(fields=['user', 'otp', 'is_used', 'expires_at'], name='otp_lookup_idx'),
+            models.Index(fields=['expires_at'], name='otp_expiry_idx'),
+        ]
+
+    @classmethod
+    def purge_expired(cls, batch_size=1000):
+        """Delete expired OTPs in small batches; returns the number deleted"""
+        deleted = 0
+        while True:
+            ids = list(cls.objects.filter(expires_at__lte=timezone.now()).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            deleted += cls.objects.filter(id__in=ids).delete()[0]
+
     def __str__(self):
         return f"{self.user.email} - {self.otp}"
 
+# Rate-limit hits per client and fixed window (api/ratelimit.py). Counted in the
+# database: the upsert is atomic across workers, unlike a file cache's incr()
+class RateLimitCounter(models.Model):
+    identity = models.CharField(max_length=320)  # '<scope>:<email or IP>:<window seconds>'
+    slot = models.BigIntegerField()  # epoch seconds // window seconds
+    count = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField()  # once the next window is over too, the row is unused
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['identity', 'slot'], name='ratelimit_slot_key'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='ratelimit_expiry_idx'),
+        ]
+
+    @classmethod
+    def purge_expired(cls, batch_size=1000):
+        """Delete counters no window reads any more, in small batches; returns the number deleted"""
+        deleted = 0
+        while True:
+            ids = list(cls.objects.filter(expires_at__lte=timezone.now()).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            deleted += cls.objects.filter(id__in=ids).delete()[0]
+
+    def __str__(self):
+        return f"{self.identity} @ {self.slot}: {self.count}"
+
+# Outgoing email queue, written in the same transaction as the order / OTP
+# and delivered by the send_queued_emails worker
+class OutboxEmail(models.Model):
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True, null=True)
+    to = models.TextField()  # comma separated recipients
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=32, blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to} ({self.status})"
+
 class CartItem(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='cart_items')
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -0,0 +1,100 @@
+# api/outbox.py
+import smtplib
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.utils import timezone
+from .models import OutboxEmail
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 60 * 60
+# A claimed batch is retried by another worker if it is not finished in time
+CLAIM_LEASE_SECONDS = 5 * 60
+
+# Errors about one message; anything else means the SMTP session is unusable
+_MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+def queue_email(subject, body, recipients, from_email=None):
+    """Store an email for the delivery worker; call inside the caller's transaction"""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=','.join(recipients),
+    )
+
+
+def backoff_delay(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def claim_batch(batch_size):
+    """
+    Atomically claim up to `batch_size` due emails for this worker. Rows left
+    in SENDING by a crashed worker become due again once their lease expires.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    due = (
+        OutboxEmail.objects
+        .filter(status__in=[OutboxEmail.PENDING, OutboxEmail.SENDING], next_attempt_at__lte=now)
+        .order_by('next_attempt_at')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    OutboxEmail.objects.filter(
+        id__in=list(due),
+        status__in=[OutboxEmail.PENDING, OutboxEmail.SENDING],
+        next_attempt_at__lte=now,
+    ).update(
+        status=OutboxEmail.SENDING,
+        claimed_by=token,
+        next_attempt_at=now + timedelta(seconds=CLAIM_LEASE_SECONDS),
+    )
+    return list(OutboxEmail.objects.filter(claimed_by=token, status=OutboxEmail.SENDING))
+
+
+def _mark_failed_attempt(email, error):
+    email.attempts += 1
+    email.last_error = str(error)[:2000]
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = OutboxEmail.FAILED
+    else:
+        email.status = OutboxEmail.PENDING
+        email.next_attempt_at = timezone.now() + backoff_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def deliver_batch(connection, batch_size=50):
+    """
+    Send one claimed batch over an already opened mail connection.
+    Returns (sent, failed) counts for this batch.
+    """
+    sent = failed = 0
+    for email in claim_batch(batch_size):
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.body,
+            from_email=email.from_email,
+            to=email.to.split(','),
+            connection=connection,
+        )
+        try:
+            message.send(fail_silently=False)
+        except OSError as e:  # smtplib.SMTPException is an OSError too
+            _mark_failed_attempt(email, e)
+            failed += 1
+            if not isinstance(e, _MESSAGE_ERRORS):
+                # The connection itself is broken: reconnect for the rest of the batch
+                connection.close()
+                connection.open()
+            continue
+
+        email.status = OutboxEmail.SENT
+        email.attempts += 1
+        email.sent_at = timezone.now()
+        email.save(update_fields=['status', 'attempts', 'sent_at'])
+        sent += 1
+    return sent, failed
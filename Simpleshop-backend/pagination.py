@@ -0,0 +1,97 @@
+# api/pagination.py
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on (ordering field, id).
+
+    The cursor holds the last row's sort value and id, so the next page is a
+    `WHERE (field, id) > (value, id)` range on the composite index instead of
+    an OFFSET - page 500 costs the same as page 1.
+    """
+    page_size = 24
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+
+    def __init__(self, ordering='-id', position=None):
+        self.descending = ordering.startswith('-')
+        self.field = ordering.lstrip('-')
+        self.next_cursor = None
+        # (sort value, id) of a row: model instances by default, or e.g.
+        # product_rows.row_position for values_list() tuples
+        self.position = position or (lambda row, field: (getattr(row, field), row.pk))
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, value, pk):
+        if isinstance(value, Decimal):
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()  # microseconds included: the filter needs the exact value
+        raw = json.dumps([value, pk], separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return value, int(pk)
+        except (TypeError, ValueError):
+            raise NotFound("Invalid cursor")
+
+    def get_ordering(self):
+        direction = '-' if self.descending else ''
+        if self.field == 'id':
+            return (f'{direction}id',)
+        # Tiebreaker runs in the same direction so one (field, id) index serves both
+        return (f'{direction}{self.field}', f'{direction}id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.get_ordering())
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            value, pk = self.decode_cursor(cursor)
+            op = 'lt' if self.descending else 'gt'
+            if self.field == 'id':
+                queryset = queryset.filter(**{f'id__{op}': pk})
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{self.field}__{op}': value}) |
+                    Q(**{self.field: value, f'id__{op}': pk})
+                )
+
+        page = list(queryset[:page_size + 1])
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_cursor = self.encode_cursor(*self.position(page[-1], self.field))
+        return page
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
@@ -0,0 +1,151 @@
+# api/payments.py
+import hashlib
+import json
+import threading
+import time
+import razorpay
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from razorpay.errors import BadRequestError, GatewayError, ServerError
+from requests.adapters import HTTPAdapter
+
+
+# How long a "creation in progress" marker blocks identical requests
+PENDING_TTL = 30
+
+
+class GatewayUnavailable(Exception):
+    """The gateway is failing or too slow; the circuit breaker may be open"""
+
+
+class GatewayBusy(Exception):
+    """An identical payment request is still being created"""
+
+
+class TimeoutSession(requests.Session):
+    """requests.Session with a default (connect, read) timeout on every call"""
+
+    def __init__(self, timeout, pool_size):
+        super().__init__()
+        self.timeout = timeout
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(*args, **kwargs)
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for
+    `cooldown` seconds; then lets one trial call through (half-open).
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                # Half-open: this caller is the trial; others wait for its outcome
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+def cart_hash(amount, items):
+    lines = sorted((item['product_id'], item['quantity']) for item in items)
+    raw = json.dumps([amount, lines], separators=(',', ':'))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class PaymentGateway:
+    def __init__(self):
+        self.session = TimeoutSession(settings.RAZORPAY_TIMEOUT, settings.RAZORPAY_POOL_SIZE)
+        self.client = razorpay.Client(
+            session=self.session,
+            auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET),
+            base_url=settings.RAZORPAY_BASE_URL,
+        )
+        self.breaker = CircuitBreaker(settings.RAZORPAY_BREAKER_THRESHOLD, settings.RAZORPAY_BREAKER_COOLDOWN)
+
+    def _create(self, payload):
+        if not self.breaker.allow():
+            raise GatewayUnavailable("Payment gateway temporarily unavailable")
+        try:
+            order = self.client.order.create(payload)
+        except BadRequestError:
+            # Our request was wrong; the gateway itself is healthy
+            self.breaker.record_success()
+            raise
+        except (requests.RequestException, ServerError, GatewayError) as e:
+            self.breaker.record_failure()
+            raise GatewayUnavailable(str(e)) from e
+        self.breaker.record_success()
+        return order
+
+    def create_order(self, user, amount_in_paise, items):
+        """
+        Create (or return the cached) gateway order for this user's cart.
+        Returns (order, created). Double clicks and retries with the same
+        user, amount and items get the same gateway order back.
+        """
+        key = f'payments:order:{user.id}:{cart_hash(amount_in_paise, items)}'
+        ttl = settings.RAZORPAY_IDEMPOTENCY_TTL
+
+        if not cache.add(key, 'pending', PENDING_TTL):
+            cached = cache.get(key)
+            if cached and cached != 'pending':
+                return cached, False
+            raise GatewayBusy("Payment order is already being created")
+
+        try:
+            order = self._create({
+                "amount": amount_in_paise,
+                "currency": "INR",
+                "payment_capture": 1
+            })
+        except Exception:
+            cache.delete(key)
+            raise
+        cache.set(key, order, ttl)
+        cache.set(f'payments:key:{order["id"]}', key, ttl)
+        return order, True
+
+    def forget_order(self, gateway_order_id):
+        """Once an order is placed, the same cart must get a fresh gateway order"""
+        key = cache.get(f'payments:key:{gateway_order_id}')
+        if key:
+            cache.delete_many([key, f'payments:key:{gateway_order_id}'])
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = PaymentGateway()
+    return _gateway
@@ -0,0 +1,28 @@
+# api/pdf_render.py
+# Runs inside the invoice process pool: keep this module free of Django
+# imports so spawned workers start fast and never touch the database.
+import os
+import tempfile
+from xhtml2pdf import pisa
+
+
+class InvoiceRenderError(Exception):
+    pass
+
+
+def render_pdf_to_file(html, path):
+    """Render `html` to a PDF at `path`, written atomically (tmp file + rename)"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as dest:
+            status = pisa.CreatePDF(html, dest=dest)
+        if status.err:
+            raise InvoiceRenderError(f"xhtml2pdf reported {status.err} error(s)")
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
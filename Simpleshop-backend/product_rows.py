@@ -0,0 +1,102 @@
+# api/product_rows.py
+from django.utils.encoding import filepath_to_uri
+from django.utils.functional import cached_property
+from .images import image_renditions, media_base_url
+from .metrics import serialization_timer
+from .models import CartItem, OrderItem
+
+# Fast path for large product lists: ProductSerializer's output built from
+# values_list() tuples - no model instances, no per-field DRF dispatch and
+# one build_absolute_uri() per response instead of one per row. Keys and
+# values match the serializers, so clients can't tell the two apart.
+
+# ProductSerializer's fields, in the order values_list() returns them
+PRODUCT_COLUMNS = ('id', 'name', 'description', 'price', 'image', 'category', 'brand', 'stock', 'rating')
+COLUMN_INDEX = {name: i for i, name in enumerate(PRODUCT_COLUMNS)}
+
+
+def product_columns(prefix=''):
+    """PRODUCT_COLUMNS through a relation, e.g. product_columns('product__')"""
+    return [prefix + name for name in PRODUCT_COLUMNS]
+
+
+def row_position(row, field):
+    """KeysetPagination position (sort value, id) of a PRODUCT_COLUMNS tuple"""
+    return row[COLUMN_INDEX[field]], row[0]
+
+
+def decimal_string(value):
+    # DecimalField(decimal_places=2) as DRF renders it
+    return f'{value:.2f}'
+
+
+class ProductRows:
+    """
+    Turns PRODUCT_COLUMNS tuples into ProductSerializer dicts. With a request,
+    image URLs are absolute (like ImageField with a request in the context),
+    otherwise site-relative. Assumes FileSystemStorage: file URLs are
+    MEDIA_URL + the file name.
+    """
+
+    def __init__(self, request=None):
+        self.request = request
+
+    @cached_property
+    def media_url(self):
+        # Only resolved once a row has an image: imageless responses never touch the host
+        return media_base_url(self.request)
+
+    def product(self, row):
+        pk, name, description, price, image, category, brand, stock, rating = row
+        media_url = self.media_url if image else None
+        return {
+            'id': pk,
+            'image': f'{media_url}{filepath_to_uri(image)}' if image else None,
+            'image_renditions': image_renditions(pk, image, media_url),
+            'name': name,
+            'description': description,
+            'price': decimal_string(price),
+            'category': category,
+            'brand': brand,
+            'stock': stock,
+            'rating': rating,
+        }
+
+    def products(self, rows):
+        with serialization_timer():
+            return [self.product(row) for row in rows]
+
+
+def cart_item_rows(user, request=None):
+    """CartItemSerializer's output for a user's cart, from one query"""
+    rows = list(
+        CartItem.objects.filter(user=user)
+        .values_list('id', 'quantity', *product_columns('product__'))
+    )
+    products = ProductRows(request)
+    with serialization_timer():
+        return [
+            {'id': row[0], 'product': products.product(row[2:]), 'quantity': row[1]}
+            for row in rows
+        ]
+
+
+def order_item_rows(orders, request=None):
+    """
+    {order_id: [OrderItemSerializer output]} for `orders` (ids or an Order
+    queryset, used as a subquery) from one query.
+    """
+    rows = list(
+        OrderItem.objects.filter(order__in=orders)
+        .values_list('order_id', 'quantity', 'price', *product_columns('product__'))
+    )
+    products = ProductRows(request)
+    items = {}
+    with serialization_timer():
+        for row in rows:
+            items.setdefault(row[0], []).append({
+                'product': products.product(row[3:]),
+                'quantity': row[1],
+                'price': decimal_string(row[2]),
+            })
+    return items
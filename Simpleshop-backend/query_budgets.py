@@ -0,0 +1,11 @@
+# api/query_budgets.py
+
+# Maximum SQL queries per endpoint, independent of how many orders/items exist.
+# Enforced by the test suite and by manage.py check_query_budgets.
+QUERY_BUDGETS = {
+    'order-history': 2,  # a page of orders + their items joined to products
+    'order-history-summary': 1,  # item counts are a subquery
+    'order-items': 2,    # ownership check + items joined to products
+    'cart': 1,           # cart items joined to products
+    'invoice': 2,        # order joined to user/address + items joined to products
+}
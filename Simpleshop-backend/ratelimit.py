@@ -0,0 +1,86 @@
+# api/ratelimit.py
+import math
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.db import connection, transaction
+from .models import RateLimitCounter
+
+_TABLE = RateLimitCounter._meta.db_table
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"Rate limit exceeded, retry in {retry_after}s")
+
+
+def client_ip(request):
+    # REMOTE_ADDR is the proxy's address when behind one; set it from
+    # X-Forwarded-For in the proxy / WSGI layer rather than trusting the header here
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _seconds_until_allowed(limit, window, previous, current, elapsed):
+    if current >= limit:
+        # Even an empty previous window would not help: wait for the next one
+        return math.ceil(window * (1 - elapsed)) + 1
+    # previous * (1 - t) + current + 1 <= limit  ->  t >= 1 - (limit - current - 1) / previous
+    needed = 1 - (limit - current - 1) / previous
+    return max(1, math.ceil(window * (needed - elapsed)))
+
+
+def _record_hits(counters):
+    """
+    +1 on every counter with one INSERT ... ON CONFLICT (identity, slot) DO
+    UPDATE, like the cart upserts. The row locks it takes are held until the
+    surrounding transaction ends, so concurrent hits on a counter queue up.
+    """
+    expires_field = RateLimitCounter._meta.get_field('expires_at')
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {_TABLE} (identity, slot, count, expires_at) VALUES (%s, %s, 1, %s) "
+            f"ON CONFLICT (identity, slot) DO UPDATE SET count = {_TABLE}.count + 1",
+            [
+                (identity, slot, expires_field.get_db_prep_value(
+                    datetime.fromtimestamp((slot + 2) * window, tz=dt_timezone.utc), connection))
+                for identity, slot, _, _, window in counters
+            ],
+        )
+
+
+def check_limits(scope, limits):
+    """
+    limits: [(identity, limit, window_seconds)], e.g. one per email and one
+    per IP. Sliding-window counters: the count for the current fixed window
+    plus the previous window's count weighted by how much of it still
+    overlaps. Every hit is recorded and every limit checked in one
+    transaction; if any limit is exceeded it rolls back, so a rejected
+    request uses up none of them (an attacker blocked by the IP limit can't
+    drain a victim's email quota). Raises RateLimited with the longest wait.
+    """
+    now = time.time()
+    counters = []
+    for identity, limit, window in limits:
+        if identity:
+            slot, offset = divmod(now, window)
+            counters.append((f'{scope}:{identity}:{window}', int(slot), offset / window, limit, window))
+    if not counters:
+        return
+
+    with transaction.atomic():
+        _record_hits(counters)
+        counts = {
+            (identity, slot): count
+            for identity, slot, count in RateLimitCounter.objects.filter(
+                identity__in={c[0] for c in counters},
+                slot__in={s for c in counters for s in (c[1], c[1] - 1)},
+            ).values_list('identity', 'slot', 'count')
+        }
+        waits = []
+        for identity, slot, elapsed, limit, window in counters:
+            current = counts[(identity, slot)]
+            previous = counts.get((identity, slot - 1), 0)
+            if previous * (1 - elapsed) + current > limit:
+                waits.append(_seconds_until_allowed(limit, window, previous, current - 1, elapsed))
+        if waits:
+            raise RateLimited(max(waits))
@@ -0,0 +1,26 @@
+# api/renderers.py
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Types orjson doesn't know (lazy strings, querysets, ...) go through DRF's encoder
+_fallback = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer's output, encoded by orjson (several times faster on large lists)"""
+
+    # Non-string keys: image_renditions maps widths (ints) to URLs, as json.dumps allows
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        body = orjson.dumps(data, default=_fallback, option=options)
+        # Like JSONRenderer, keep the output safe to embed in JavaScript
+        if b'\xe2\x80\xa8' in body or b'\xe2\x80\xa9' in body:
+            body = body.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return body
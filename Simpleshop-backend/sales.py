@@ -0,0 +1,153 @@
+# api/sales.py
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import DailySalesRollup, OrderItem, Product
+
+ALL = DailySalesRollup.ALL
+_TABLE = DailySalesRollup._meta.db_table
+
+# Dimensions the analytics endpoint can group by
+GROUPS = ('day', 'category', 'brand')
+
+REVENUE_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+
+def rollup_keys(day, category, brand):
+    """Every rollup row a sale of a (category, brand) product on `day` counts towards"""
+    return [(day, category, brand), (day, category, ALL), (day, ALL, brand), (day, ALL, ALL)]
+
+
+def sales_deltas(day, lines):
+    """lines: one order's (category, brand, quantity, price) -> {key: [units, revenue, orders]}"""
+    deltas = {}
+    for category, brand, quantity, price in lines:
+        for key in rollup_keys(day, category, brand):
+            # The order counts once per row, however many of its lines fall in it
+            delta = deltas.setdefault(key, [0, Decimal('0'), 1])
+            delta[0] += quantity
+            delta[1] += price * quantity
+    return deltas
+
+
+def apply_sales_deltas(deltas):
+    """
+    Add deltas with one INSERT ... ON CONFLICT (day, category, brand) DO UPDATE
+    for all rows, like the cart upserts: missing rows are created, existing
+    ones incremented in place. SQLite >= 3.24 and PostgreSQL.
+    """
+    if not deltas:
+        return
+    day_field = DailySalesRollup._meta.get_field('day')
+    revenue_field = DailySalesRollup._meta.get_field('revenue')
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {_TABLE} (day, category, brand, units, revenue, order_count) "
+            f"VALUES (%s, %s, %s, %s, %s, %s) "
+            f"ON CONFLICT (day, category, brand) DO UPDATE SET "
+            f"units = {_TABLE}.units + excluded.units, "
+            f"revenue = {_TABLE}.revenue + excluded.revenue, "
+            f"order_count = {_TABLE}.order_count + excluded.order_count",
+            [
+                (day_field.get_db_prep_value(day, connection), category, brand, units,
+                 revenue_field.get_db_prep_value(revenue, connection), orders)
+                for (day, category, brand), (units, revenue, orders) in deltas.items()
+            ],
+        )
+
+
+def record_order_sales(order, items):
+    """
+    Add a new order to the rollups, inside its creation transaction. items:
+    the validated lines (product_id, quantity, price). Sales are filed under
+    the product's category and brand at the time of sale.
+    """
+    product_ids = {item['product_id'] for item in items}
+    products = {
+        pk: (category, brand)
+        for pk, category, brand in Product.objects.filter(id__in=product_ids).values_list('id', 'category', 'brand')
+    }
+    lines = [(*products[item['product_id']], item['quantity'], item['price']) for item in items]
+    apply_sales_deltas(sales_deltas(timezone.localdate(order.created_at), lines))
+
+
+def rebuild_sales_rollups(start=None, end=None):
+    """
+    Recompute the rollups from OrderItem for the days in [start, end] (all by
+    default): for backfills, bulk-loaded orders, and after orders are edited
+    or deleted. Uses the products' current category and brand.
+    """
+    lines = OrderItem.objects.all()
+    rollups = DailySalesRollup.objects.all()
+    # Half-open datetime bounds, like the invoice export, so order_created_idx is usable
+    if start:
+        lines = lines.filter(order__created_at__gte=timezone.make_aware(datetime.combine(start, time.min)))
+        rollups = rollups.filter(day__gte=start)
+    if end:
+        lines = lines.filter(order__created_at__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)))
+        rollups = rollups.filter(day__lte=end)
+    lines = lines.annotate(day=TruncDate('order__created_at'))
+
+    rows = []
+    # One grouped query per kind of row: (category, brand), category, brand, whole day
+    for dimensions in (('category', 'brand'), ('category',), ('brand',), ()):
+        grouped = lines.values('day', *[f'product__{d}' for d in dimensions]).annotate(
+            units=Sum('quantity'),
+            revenue=Sum(F('price') * F('quantity'), output_field=REVENUE_FIELD),
+            order_count=Count('order', distinct=True),
+        )
+        for row in grouped.iterator():
+            rows.append(DailySalesRollup(
+                day=row['day'],
+                category=row['product__category'] if 'category' in dimensions else ALL,
+                brand=row['product__brand'] if 'brand' in dimensions else ALL,
+                units=row['units'], revenue=row['revenue'], order_count=row['order_count'],
+            ))
+
+    with transaction.atomic():
+        rollups.delete()
+        DailySalesRollup.objects.bulk_create(rows, batch_size=2000)
+    return len(rows)
+
+
+def _in_range(start, end):
+    rollups = DailySalesRollup.objects.all()
+    if start:
+        rollups = rollups.filter(day__gte=start)
+    if end:
+        rollups = rollups.filter(day__lte=end)
+    return rollups
+
+
+def _sums():
+    return {'units': Sum('units'), 'revenue': Sum('revenue'), 'order_count': Sum('order_count')}
+
+
+def sales_totals(start=None, end=None, category=None, brand=None):
+    """Units, revenue and orders over [start, end], optionally for one category / brand"""
+    totals = _in_range(start, end).filter(category=category or ALL, brand=brand or ALL).aggregate(**_sums())
+    return {
+        'units': totals['units'] or 0,
+        'revenue': totals['revenue'] or Decimal('0.00'),
+        'order_count': totals['order_count'] or 0,
+    }
+
+
+def sales_report(start, end, by=('day',), category=None, brand=None):
+    """
+    Rows of units / revenue / order_count over [start, end] grouped by `by`
+    (a subset of GROUPS). Reads the rows of the matching kind only, so order
+    counts are exact: summing over days never counts an order twice.
+    """
+    rows = _in_range(start, end)
+    for field, value in (('category', category), ('brand', brand)):
+        if value:
+            rows = rows.filter(**{field: value})
+        elif field in by:
+            rows = rows.exclude(**{field: ALL})
+        else:
+            rows = rows.filter(**{field: ALL})
+    return list(rows.values(*by).annotate(**_sums()).order_by(*by))
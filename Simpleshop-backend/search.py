@@ -0,0 +1,143 @@
+# api/search.py
+import re
+from django.db import connection, connections, router
+from .models import Product
+
+# SQLite FTS5 index over Product.name / Product.description. It is an
+# external-content table (no second copy of the text) kept in sync by
+# triggers, so bulk_create() and queryset.update() are covered as well.
+PRODUCT_TABLE = Product._meta.db_table
+FTS_TABLE = f'{PRODUCT_TABLE}_fts'
+VOCAB_TABLE = f'{PRODUCT_TABLE}_fts_vocab'
+
+# bm25 column weights: a hit in the name outranks one in the description
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Ranked ids fetched from FTS before the catalog filters are applied
+MAX_CANDIDATES = 500
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='{PRODUCT_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )""",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {VOCAB_TABLE} USING fts5vocab({FTS_TABLE}, 'col')",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {PRODUCT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {PRODUCT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, description ON {PRODUCT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+
+def ensure_search_index(using=connection):
+    """Create the FTS table and triggers if missing (called after migrate)"""
+    if using.vendor != 'sqlite':
+        return
+    with using.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        exists = cursor.fetchone() is not None
+        for statement in _SCHEMA:
+            cursor.execute(statement)
+        if not exists:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def rebuild_search_index(using=connection):
+    with using.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+def tokenize(query):
+    return [t.lower() for t in _TOKEN_RE.findall(query or '')]
+
+
+def build_match_query(tokens):
+    # Every token is a quoted prefix query ("sams"* matches "samsung"), so user
+    # input can never inject FTS operators
+    return ' '.join(f'"{t}"*' for t in tokens)
+
+
+def search_product_ids(query, limit=MAX_CANDIDATES):
+    """Product ids matching `query`, best bm25 rank first"""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    with connections[router.db_for_read(Product)].cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({FTS_TABLE}, %s, %s) LIMIT %s",
+            [build_match_query(tokens), NAME_WEIGHT, DESCRIPTION_WEIGHT, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _edit_distance(a, b, max_distance):
+    # Levenshtein with early exit once every cell in a row exceeds max_distance
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def suggest_terms(query, limit=8):
+    """
+    Autocomplete for the last word of `query` from the product-name vocabulary:
+    prefix completions first, then close spellings (edit distance 1-2) so
+    "samsnug" still suggests "samsung".
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    head, term = tokens[:-1], tokens[-1]
+
+    with connections[router.db_for_read(Product)].cursor() as cursor:
+        cursor.execute(
+            f"SELECT term FROM {VOCAB_TABLE} WHERE col = 'name' AND term >= %s AND term < %s "
+            f"ORDER BY doc DESC LIMIT %s",
+            [term, term + '\uffff', limit],
+        )
+        terms = [row[0] for row in cursor.fetchall()]
+
+        if len(terms) < limit and len(term) >= 3:
+            max_distance = 1 if len(term) <= 5 else 2
+            cursor.execute(
+                f"SELECT term, doc FROM {VOCAB_TABLE} WHERE col = 'name' AND term >= %s AND term < %s "
+                f"AND length(term) BETWEEN %s AND %s",
+                [term[0], term[0] + '\uffff', len(term) - max_distance, len(term) + max_distance],
+            )
+            fuzzy = []
+            for candidate, docs in cursor.fetchall():
+                if candidate in terms:
+                    continue
+                distance = _edit_distance(term, candidate, max_distance)
+                if distance <= max_distance:
+                    fuzzy.append((distance, -docs, candidate))
+            terms += [candidate for _, _, candidate in sorted(fuzzy)[:limit - len(terms)]]
+
+    prefix = ' '.join(head)
+    return [f'{prefix} {t}' if prefix else t for t in terms]
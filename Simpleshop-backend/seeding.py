@@ -0,0 +1,169 @@
+# api/seeding.py
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from .models import CustomUser, Product, UserAddress, Order, OrderItem, UserOrderSequence
+from .catalog_cache import bump_catalog_version
+
+# Word banks for synthetic catalog data (benchmarks / load tests)
+PRODUCT_NOUNS = {
+    'Smartphones': ['Phone', 'Galaxy', 'Note', 'Pro', 'Lite', 'Ultra'],
+    'Laptops': ['Notebook', 'Book', 'Ultrabook', 'Gaming Laptop', 'Chromebook'],
+    'Smart TVs': ['Smart TV', 'QLED TV', 'OLED TV', 'Android TV'],
+    'Smart Watches & Wearables': ['Smartwatch', 'Fitness Band', 'Watch'],
+    'Audio Devices': ['Earbuds', 'Headphones', 'Soundbar', 'Speaker'],
+    'Cameras & Photography': ['Mirrorless Camera', 'DSLR', 'Action Camera', 'Lens'],
+    'Smart Home Appliances': ['Air Purifier', 'Smart Plug', 'Robot Vacuum', 'Air Fryer'],
+    'Printers & Mouse': ['Printer', 'Wireless Mouse', 'Ink Tank', 'Keyboard Combo'],
+    'Chargers & Power Banks': ['Power Bank', 'Fast Charger', 'Wireless Charger', 'Cable'],
+}
+
+DESCRIPTION_WORDS = (
+    'fast durable lightweight premium wireless bluetooth battery display amoled '
+    'retina processor storage memory charging waterproof noise cancelling camera '
+    'zoom portable sleek compact powerful efficient warranty stereo bass hdr '
+    'voice assistant smart connectivity usb type-c ergonomic silent crisp vivid'
+).split()
+
+
+def build_products(count, seed=42):
+    """Yield `count` unsaved, realistic-looking Product instances"""
+    rng = random.Random(seed)
+    categories = [value for value, _ in Product.CATEGORY_CHOICES]
+    brands = [value for value, _ in Product.BRAND_CHOICES]
+    for i in range(count):
+        category = rng.choice(categories)
+        brand = rng.choice(brands)
+        noun = rng.choice(PRODUCT_NOUNS[category])
+        yield Product(
+            name=f"{brand} {noun} {rng.choice('ABCDEFGHJKLMNPRSTX')}{rng.randint(1, 99)}",
+            description=' '.join(rng.choices(DESCRIPTION_WORDS, k=rng.randint(12, 40))),
+            price=Decimal(rng.randint(299, 199999)),
+            category=category,
+            brand=brand,
+            stock=rng.choice([0, 0, 3, 10, 25, 50, 100]),
+            rating=round(rng.uniform(1, 5), 1),
+        )
+
+
+def seed_products(count, seed=42, batch_size=2000):
+    products = list(build_products(count, seed))
+    Product.objects.bulk_create(products, batch_size=batch_size)
+    # bulk_create skips the Product signals
+    transaction.on_commit(bump_catalog_version)
+    return len(products)
+
+
+FIRST_NAMES = 'Aarav Vivaan Aditya Diya Ananya Ishaan Kavya Rohan Saanvi Arjun Meera Kabir Nisha Rahul Priya'.split()
+LAST_NAMES = 'Sharma Patel Iyer Reddy Nair Gupta Singh Desai Joshi Kulkarni Mehta Rao Das Khan Verma'.split()
+CITIES = [
+    ('Mumbai', 'Maharashtra', '400001'), ('Pune', 'Maharashtra', '411001'), ('Bengaluru', 'Karnataka', '560001'),
+    ('Chennai', 'Tamil Nadu', '600001'), ('Delhi', 'Delhi', '110001'), ('Hyderabad', 'Telangana', '500001'),
+]
+
+LOAD_TEST_EMAIL_DOMAIN = 'loadtest.example.com'
+# Every seeded user can log in with this password
+LOAD_TEST_PASSWORD = 'loadtest-password'
+
+
+def load_test_email(n):
+    return f'user{n}@{LOAD_TEST_EMAIL_DOMAIN}'
+
+
+@contextmanager
+def explicit_timestamps(model, field_name):
+    """Let bulk_create keep the created_at values we set instead of auto_now_add"""
+    field = model._meta.get_field(field_name)
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed_users(count, seed=42, batch_size=5000):
+    """Users with one address each; returns [(user_id, address_id)]"""
+    rng = random.Random(seed)
+    password = make_password(LOAD_TEST_PASSWORD)  # hashing once keeps 50k users fast
+    start = CustomUser.objects.filter(email__endswith=f'@{LOAD_TEST_EMAIL_DOMAIN}').count()
+    pairs = []
+    numbers = range(start, start + count)
+    for batch in _batches(numbers, batch_size):
+        users = CustomUser.objects.bulk_create([
+            CustomUser(email=load_test_email(n), full_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                       password=password)
+            for n in batch
+        ])
+        addresses = []
+        for user in users:
+            city, state, pincode = rng.choice(CITIES)
+            addresses.append(UserAddress(
+                user=user, name=user.full_name, mobile_number=f'9{rng.randint(100000000, 999999999)}',
+                address=f'{rng.randint(1, 999)} Main Road', locality='Central', city=city, state=state,
+                pincode=pincode,
+            ))
+        addresses = UserAddress.objects.bulk_create(addresses)
+        pairs.extend((a.user_id, a.id) for a in addresses)
+    return pairs
+
+
+def seed_orders(count, users, products, seed=42, days=365, batch_size=5000):
+    """
+    `count` orders spread over the last `days` days, 1-5 lines each, for the
+    given [(user_id, address_id)] and [(product_id, price)]. Order numbers are
+    assigned per user and the UserOrderSequence counters set to match.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    last_numbers = dict(UserOrderSequence.objects.values_list('user_id', 'last_number'))
+    items_created = 0
+
+    with explicit_timestamps(Order, 'created_at'):
+        for batch in _batches(range(count), batch_size):
+            orders, lines = [], []
+            for _ in batch:
+                user_id, address_id = rng.choice(users)
+                last_numbers[user_id] = last_numbers.get(user_id, 0) + 1
+                picked = rng.sample(products, rng.randint(1, 5))
+                quantities = [rng.choice([1, 1, 1, 2, 3]) for _ in picked]
+                orders.append(Order(
+                    user_id=user_id, address_id=address_id,
+                    total_price=sum(price * qty for (_, price), qty in zip(picked, quantities)),
+                    is_paid=rng.random() < 0.8,
+                    created_at=now - timedelta(seconds=rng.randint(0, days * 86400)),
+                    user_order_number=last_numbers[user_id],
+                ))
+                lines.append(list(zip(picked, quantities)))
+
+            orders = Order.objects.bulk_create(orders)
+            items = [
+                OrderItem(order_id=order.id, product_id=product_id, quantity=qty, price=price)
+                for order, order_lines in zip(orders, lines)
+                for (product_id, price), qty in order_lines
+            ]
+            OrderItem.objects.bulk_create(items)
+            items_created += len(items)
+
+    existing = set(UserOrderSequence.objects.values_list('user_id', flat=True))
+    UserOrderSequence.objects.bulk_create([
+        UserOrderSequence(user_id=user_id, last_number=n)
+        for user_id, n in last_numbers.items() if user_id not in existing
+    ], batch_size=batch_size)
+    for user_id in existing & set(last_numbers):
+        UserOrderSequence.objects.filter(user_id=user_id).update(last_number=last_numbers[user_id])
+    return items_created
@@ -1,6 +1,12 @@
 from rest_framework import serializers
 from .models import CustomUser, Product, UserAddress, Order, OrderItem , CartItem
 from django.contrib.auth import update_session_auth_hash
+from django.db import transaction
+from .inventory import InsufficientStock, commit_order_stock, order_lines
+from .metrics import TimedSerializerMixin, log_event
+from .images import image_renditions, media_base_url
+from .sales import record_order_sales
+import logging
 import re
 
 # ------------------ AUTH ------------------
@@ -20,7 +26,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         )
         return user
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ('id', 'email', 'full_name')
@@ -31,16 +37,23 @@ class UpdatePasswordSerializer(serializers.Serializer):
 
 # ------------------ PRODUCTS ------------------
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     image = serializers.ImageField(use_url=True)
+    # Resized WebP / JPEG variants with ready-made srcset strings (see api/images.py)
+    image_renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = '__all__'
 
+    def get_image_renditions(self, product):
+        if not product.image:
+            return None
+        return image_renditions(product.id, product.image.name, media_base_url(self.context.get('request')))
+
 # ------------------ ADDRESS ------------------
 
-class UserAddressSerializer(serializers.ModelSerializer):
+class UserAddressSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = UserAddress
         fields = [
@@ -62,7 +75,7 @@ class UserAddressSerializer(serializers.ModelSerializer):
 # ------------------ ORDER ITEMS ------------------
 
 # For reading (GET)
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     product = ProductSerializer()
 
     class Meta:
@@ -71,6 +84,9 @@ class OrderItemSerializer(serializers.ModelSerializer):
 
 # For creating (POST)
 class OrderItemCreateSerializer(serializers.ModelSerializer):
+    # Plain id: existence is checked for all items at once in OrderCreateSerializer
+    product = serializers.IntegerField(source='product_id')
+
     class Meta:
         model = OrderItem
         fields = ['product', 'quantity', 'price']
@@ -78,8 +94,10 @@ class OrderItemCreateSerializer(serializers.ModelSerializer):
 # ------------------ ORDER ------------------
 
 # For reading (GET)
-class OrderSerializer(serializers.ModelSerializer):
-    items = OrderItemSerializer(many=True, read_only=True)
+class OrderSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # OrderItemSerializer's output, built by UserOrdersView from one values_list()
+    # query (api/product_rows.py) and passed in the context as {order_id: [items]}
+    items = serializers.SerializerMethodField()
 
     class Meta:
         model = Order
@@ -88,16 +106,43 @@ class OrderSerializer(serializers.ModelSerializer):
             'razorpay_order_id', 'razorpay_payment_id', 'razorpay_signature'
         ]
 
+    def get_items(self, order):
+        items = self.context.get('order_items')
+        if items is None:
+            return OrderItemSerializer(order.items.all(), many=True, context=self.context).data
+        return items.get(order.id, [])
+
+# For the order history list (GET /api/orders/?view=summary)
+class OrderSummarySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # Units across all lines, annotated by UserOrdersView
+    item_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ['id', 'user_order_number', 'created_at', 'total_price', 'is_paid', 'item_count']
+
 # For creating (POST)
-class OrderCreateSerializer(serializers.ModelSerializer):
+class OrderCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     items = OrderItemCreateSerializer(many=True)
 
     class Meta:
         model = Order
         fields = [
             'address', 'total_price', 'is_paid', 'items',
-            'razorpay_order_id', 'razorpay_payment_id', 'razorpay_signature'
+            'razorpay_order_id', 'razorpay_payment_id', 'razorpay_signature', 'stock_shortfall'
         ]
+        read_only_fields = ['stock_shortfall']
+
+    def validate_items(self, items):
+        # One `id IN (...)` query instead of a lookup per line item
+        product_ids = {item['product_id'] for item in items}
+        existing = set(Product.objects.filter(id__in=product_ids).values_list('id', flat=True))
+        missing = sorted(product_ids - existing)
+        if missing:
+            raise serializers.ValidationError(
+                [f'Invalid product id "{pk}" - object does not exist.' for pk in missing]
+            )
+        return items
 
     def create(self, validated_data):
         items_data = validated_data.pop('items')
@@ -106,17 +151,48 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         # Safely remove `user` from validated_data if it’s included for any reason
         validated_data.pop('user', None)
 
-        order = Order.objects.create(user=request.user, **validated_data)
-
-        for item in items_data:
-            OrderItem.objects.create(order=order, **item)
+        # The order, its lines, the stock they take and the sales rollups
+        # are written together or not at all
+        with transaction.atomic():
+            order = Order.objects.create(user=request.user, **validated_data)
+            OrderItem.objects.bulk_create([OrderItem(order=order, **item) for item in items_data])
+            try:
+                # A paid order is never rejected: the money is already taken
+                short = commit_order_stock(
+                    order, order_lines(items_data), order.razorpay_order_id, allow_shortfall=order.is_paid,
+                )
+            except InsufficientStock as e:
+                raise serializers.ValidationError({"items": [str(e)]})
+            if short:
+                order.items.filter(product_id__in=short).update(backordered=True)
+                order.stock_shortfall = True
+                order.save(update_fields=['stock_shortfall'])
+                log_event('order_stock_shortfall', level=logging.WARNING, order_id=order.id,
+                          user_id=order.user_id, product_ids=sorted(short))
+            record_order_sales(order, items_data)
 
         return order
 
-class CartItemSerializer(serializers.ModelSerializer):
+class CartItemSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)
     product_id = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all(), source='product', write_only=True)
 
     class Meta:
         model = CartItem
         fields = ['id', 'product', 'product_id', 'quantity']
+
+# Items to hold stock for while the customer pays (POST /api/razorpay/create-order/)
+class StockReservationItemSerializer(serializers.Serializer):
+    product = serializers.IntegerField(source='product_id')
+    quantity = serializers.IntegerField(min_value=1)
+
+# For batch cart updates (POST /api/cart/batch/)
+class CartOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=['add', 'set', 'remove'])
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0, default=1)
+
+# For merging the local (logged-out) cart at login (POST /api/cart/merge/)
+class CartMergeItemSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0)
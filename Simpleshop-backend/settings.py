@@ -16,6 +16,13 @@ load_dotenv()  # Loads the .env file
 
 RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID")
 RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET")
+# Point at a local stub (manage.py run_stub_gateway) for testing
+RAZORPAY_BASE_URL = os.getenv("RAZORPAY_BASE_URL", "https://api.razorpay.com")
+RAZORPAY_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+RAZORPAY_POOL_SIZE = 10
+RAZORPAY_BREAKER_THRESHOLD = 5  # consecutive failures before the breaker opens
+RAZORPAY_BREAKER_COOLDOWN = 30  # seconds before a trial call is let through
+RAZORPAY_IDEMPOTENCY_TTL = 15 * 60  # repeat checkouts of the same cart reuse the gateway order
 
 # print("Razorpay Key ID:", RAZORPAY_KEY_ID)   # Add this temporarily to check if env loads
 # print("Razorpay Key Secret:", RAZORPAY_KEY_SECRET)
@@ -113,6 +120,11 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")  # Your Gmail address
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL")
 
+# Google ID token verification (api/google_auth.py). The certs URL can point
+# at a local stand-in; set the client id to also enforce the token audience.
+GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+GOOGLE_OAUTH_CLIENT_ID = os.getenv("GOOGLE_OAUTH_CLIENT_ID")
+
 REST_AUTH = {
     'PASSWORD_RESET_CONFIRM_URL': 'password/reset/confirm/{uid}/{token}/',
     'USE_JWT': True,
@@ -125,6 +137,8 @@ LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',  # first, so it times everything below it
+    'api.compression.CompressionMiddleware',  # before anything that changes the body
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -134,6 +148,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    'api.db_router.StickyPrimaryMiddleware',
 ]
 
 CORS_ALLOW_ALL_ORIGINS = True  # Dev only! Use `CORS_ALLOWED_ORIGINS` in production
@@ -160,13 +175,73 @@ WSGI_APPLICATION = 'simpleshop.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite tuned for concurrent web workers (Django >= 5.1 reads these OPTIONS):
+# - WAL: readers no longer block the writer and vice versa
+# - synchronous=NORMAL: fsync at checkpoints, not on every commit (safe with WAL)
+# - mmap / cache_size: hot pages served from memory
+# - timeout: wait up to 20s for the write lock instead of "database is locked"
+# - IMMEDIATE: every atomic() takes the write lock at BEGIN, so a transaction
+#   that reads first can't fail on the lock upgrade (which skips the busy wait)
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL;'
+    'PRAGMA synchronous=NORMAL;'
+    'PRAGMA mmap_size=268435456;'  # 256 MB
+    'PRAGMA cache_size=-65536;'  # 64 MB
+    'PRAGMA temp_store=MEMORY'
+)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': SQLITE_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # A file rather than SQLite's shared in-memory database, so the
+        # concurrency tests and benchmarks lock the way production does
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+# Optional read replica (e.g. a LiteFS / Litestream read copy) for catalog reads.
+# See api/db_router.py: writes and orders / cart / auth always use 'default'.
+REPLICA_DATABASE_PATH = os.getenv("REPLICA_DATABASE_PATH")
+if REPLICA_DATABASE_PATH:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': REPLICA_DATABASE_PATH,
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['api.db_router.PrimaryReplicaRouter']
+# After a write, the client reads from the primary for this long (replica lag budget)
+REPLICA_STICKY_SECONDS = 5
+
+# Response compression (api/compression.py). Smaller bodies aren't worth it;
+# bigger ones are compressed chunk by chunk while they are sent.
+COMPRESSION_MIN_BYTES = 1024
+COMPRESSION_STREAM_BYTES = 256 * 1024
+
+# Cache shared by all workers (catalog responses and version counter).
+# Redis when REDIS_URL is set, otherwise a file cache on local disk.
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'cache',
+        }
+    }
+
 AUTH_USER_MODEL = 'api.CustomUser'
 
 # Password validation
@@ -208,6 +283,49 @@ import os
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Rendered invoice PDFs (private: not under MEDIA_ROOT)
+INVOICE_ROOT = BASE_DIR / 'invoices'
+INVOICE_RENDER_WORKERS = int(os.getenv("INVOICE_RENDER_WORKERS", 2))
+INVOICE_RENDER_TIMEOUT = 30  # seconds a request waits for a cache-miss render
+# Let the web server send the file: 'X-Accel-Redirect' (nginx, uses the prefix
+# below as an internal location) or 'X-Sendfile' (Apache). Unset = Django streams it.
+INVOICE_SENDFILE_HEADER = os.getenv("INVOICE_SENDFILE_HEADER")
+INVOICE_SENDFILE_PREFIX = '/protected/invoices/'
+
+# Product image renditions (api/images.py): widths in px and per-format quality
+IMAGE_RENDITION_WIDTHS = (160, 320, 640, 1024)
+IMAGE_RENDITION_QUALITY = {'webp': 80, 'jpeg': 82}
+IMAGE_RENDER_WORKERS = int(os.getenv("IMAGE_RENDER_WORKERS", 2))
+IMAGE_RENDER_TIMEOUT = 10  # seconds a request waits for a missing rendition
+
+# How long stock stays reserved for a started payment (release_expired_reservations)
+STOCK_RESERVATION_MINUTES = 15
+
+# Password reset OTPs: validity, and sliding-window limits as (requests, window seconds),
+# counted in the database (api/ratelimit.py) so every worker sees every hit
+OTP_VALIDITY_MINUTES = 5
+OTP_SEND_LIMITS = {'email': (3, 15 * 60), 'ip': (20, 60 * 60)}
+OTP_VERIFY_LIMITS = {'email': (5, 15 * 60), 'ip': (50, 60 * 60)}
+
+# Metrics (/metrics, Prometheus) and structured event logs
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # when set, scrapes need "Authorization: Bearer <token>"
+SLOW_REQUEST_SECONDS = 1.0  # slower requests are always logged
+LOG_EVENT_SAMPLE_RATE = float(os.getenv("LOG_EVENT_SAMPLE_RATE", "0.1"))  # share of routine events logged
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'event': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'event'},
+    },
+    'loggers': {
+        'api.events': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -219,7 +337,8 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        # Same JSON as DRF's JSONRenderer, encoded with orjson
+        'api.renderers.ORJSONRenderer',
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
 }
@@ -0,0 +1,63 @@
+# api/signals.py
+from collections import Counter
+from django.db import connections, transaction
+from django.db.models.signals import pre_save, post_save, post_delete, post_migrate
+from django.dispatch import receiver
+from .models import Product, Order
+from .facets import product_facet_keys, apply_facet_deltas
+from .search import ensure_search_index
+from .catalog_cache import bump_catalog_version
+from .invoices import prerender_invoice
+from .images import prerender_renditions
+
+
+def _facet_keys(product):
+    return product_facet_keys(product.brand, product.category, product.rating, product.stock)
+
+
+# 📸 Remember the facet keys and image a product had before it is updated
+@receiver(pre_save, sender=Product)
+def product_pre_save(sender, instance, **kwargs):
+    instance._old_facet_keys = []
+    instance._old_image = None
+    if instance.pk:
+        old = Product.objects.filter(pk=instance.pk).values('brand', 'category', 'rating', 'stock', 'image').first()
+        if old:
+            instance._old_image = old.pop('image')
+            instance._old_facet_keys = product_facet_keys(**old)
+
+
+# 📊 Move the product's counts from its old facet values to the new ones
+@receiver(post_save, sender=Product)
+def product_post_save(sender, instance, **kwargs):
+    deltas = Counter(_facet_keys(instance))
+    deltas.subtract(getattr(instance, '_old_facet_keys', []))
+    apply_facet_deltas(deltas)
+    # Bump after commit so no request can cache pre-commit data under the new version
+    transaction.on_commit(bump_catalog_version)
+
+    # 🖼️ New or replaced image: render its renditions in the background
+    if instance.image and instance.image.name != getattr(instance, '_old_image', None):
+        transaction.on_commit(lambda: prerender_renditions(instance.id))
+
+
+@receiver(post_delete, sender=Product)
+def product_post_delete(sender, instance, **kwargs):
+    deltas = Counter()
+    deltas.subtract(_facet_keys(instance))
+    apply_facet_deltas(deltas)
+    transaction.on_commit(bump_catalog_version)
+
+
+# 🔎 Create the FTS5 search index (and its sync triggers) after migrate
+@receiver(post_migrate)
+def create_search_index(sender, using, **kwargs):
+    if sender.name == 'api':
+        ensure_search_index(connections[using])
+
+
+# 🧾 Pre-render the invoice in the background once an order is paid
+@receiver(post_save, sender=Order)
+def order_post_save(sender, instance, **kwargs):
+    if instance.is_paid:
+        transaction.on_commit(lambda: prerender_invoice(instance.id))
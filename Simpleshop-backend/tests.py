@@ -0,0 +1,348 @@
+# api/tests.py
+import shutil
+import tempfile
+import threading
+from unittest import mock
+from django.db import connection, OperationalError, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import RefreshToken
+from .cart import apply_cart_operations, fold_operations, merge_cart
+from .db_router import REPLICA, PrimaryReplicaRouter, StickyPrimaryMiddleware, replica_reads
+from .inventory import InsufficientStock, decrement_stock
+from .models import CustomUser, Product, Order, OrderItem, CartItem
+from .query_budgets import QUERY_BUDGETS
+from .ratelimit import RateLimited, check_limits
+from .seeding import build_products
+from .views import UserOrdersView, OrderItemsView, CartView, CreateOrderView, generate_invoice
+
+# Concurrency tests: threads, each on its own connection to the file-backed test database
+THREADS = 8
+
+# Catalog versions stay out of the shared cache
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def create_products(count, stock=50):
+    products = list(build_products(count))
+    for product in products:
+        product.stock = stock
+    return Product.objects.bulk_create(products)
+
+
+def run_concurrently(calls, work):
+    """
+    Call work() `calls` times from each of THREADS threads released together,
+    like the stress_* commands. Retries SQLite lock timeouts; returns how many
+    calls gave up.
+    """
+    start = threading.Barrier(THREADS)
+    gave_up = []
+
+    def worker():
+        start.wait()
+        try:
+            for _ in range(calls):
+                for attempt in range(20):
+                    try:
+                        work()
+                        break
+                    except OperationalError:  # SQLite: database is locked
+                        if attempt == 19:
+                            gave_up.append(1)
+        finally:
+            connection.close()
+
+    pool = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return len(gave_up)
+
+
+# ------------------ QUERY BUDGETS ------------------
+
+class QueryBudgetTests(TestCase):
+    """The order history, cart and invoice endpoints cost the same queries for 1 or 40 orders"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='budget@example.com', full_name='Budget')
+        products = create_products(5)
+        for _ in range(40):
+            order = Order.objects.create(user=cls.user, total_price=0)
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, quantity=1, price=product.price) for product in products
+            ])
+        CartItem.objects.bulk_create([CartItem(user=cls.user, product=p, quantity=2) for p in products])
+        cls.order = Order.objects.filter(user=cls.user).first()
+
+    def get(self, view, path, budget, params=None, **kwargs):
+        request = APIRequestFactory().get(path, params or {})
+        force_authenticate(request, user=self.user)
+        with self.assertNumQueries(QUERY_BUDGETS[budget]):
+            response = view(request, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_order_history(self):
+        response = self.get(UserOrdersView.as_view(), '/api/orders/', 'order-history')
+        self.assertTrue(all(len(order['items']) == 5 for order in response.data['results']))
+
+    def test_order_history_summary(self):
+        response = self.get(UserOrdersView.as_view(), '/api/orders/', 'order-history-summary', {'view': 'summary'})
+        self.assertTrue(all(order['item_count'] == 5 for order in response.data['results']))
+
+    def test_order_items(self):
+        response = self.get(OrderItemsView.as_view(), f'/api/orders/{self.order.id}/items/', 'order-items',
+                            order_id=self.order.id)
+        self.assertEqual(len(response.data), 5)
+
+    def test_cart(self):
+        response = self.get(CartView.as_view(), '/api/cart/', 'cart')
+        self.assertEqual(len(response.data), 5)
+
+    def test_invoice(self):
+        invoice_root = tempfile.mkdtemp(prefix='invoice-test-')
+        self.addCleanup(shutil.rmtree, invoice_root, ignore_errors=True)
+        with override_settings(INVOICE_ROOT=invoice_root):
+            response = self.get(generate_invoice, f'/invoice/{self.order.id}/', 'invoice', order_id=self.order.id)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+
+
+# ------------------ ORDER NUMBERS ------------------
+
+@override_settings(CACHES=LOCAL_CACHE)
+class OrderNumberTests(TransactionTestCase):
+    def test_numbers_start_at_one_per_user(self):
+        first = CustomUser.objects.create_user(email='numbers-1@example.com', full_name='First')
+        second = CustomUser.objects.create_user(email='numbers-2@example.com', full_name='Second')
+        numbers = [Order.objects.create(user=user, total_price=0).user_order_number for user in (first, second, first)]
+        self.assertEqual(numbers, [1, 1, 2])
+
+    def test_concurrent_orders_get_unique_gapless_numbers(self):
+        user = CustomUser.objects.create_user(email='numbers@example.com', full_name='Numbers')
+
+        def place_order():
+            Order.objects.create(user=user, total_price=0)
+
+        gave_up = run_concurrently(5, place_order)
+        numbers = sorted(Order.objects.filter(user=user).values_list('user_order_number', flat=True))
+        self.assertEqual(numbers, list(range(1, THREADS * 5 - gave_up + 1)))
+
+
+# ------------------ CART ------------------
+
+class CartOperationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='cart@example.com', full_name='Cart')
+        cls.first, cls.second = create_products(2)
+
+    def quantities(self):
+        return dict(CartItem.objects.filter(user=self.user).values_list('product_id', 'quantity'))
+
+    def test_fold_operations(self):
+        effects = fold_operations([
+            {'op': 'add', 'product_id': 1, 'quantity': 2},
+            {'op': 'add', 'product_id': 1},
+            {'op': 'remove', 'product_id': 2},
+            {'op': 'add', 'product_id': 2, 'quantity': 4},
+            {'op': 'set', 'product_id': 3, 'quantity': 0},
+        ])
+        self.assertEqual(effects, {1: ('add', 3), 2: ('set', 4), 3: ('remove', None)})
+
+    def test_operations_apply_in_one_transaction(self):
+        CartItem.objects.create(user=self.user, product=self.first, quantity=1)
+        third, = create_products(1)
+        CartItem.objects.create(user=self.user, product=third, quantity=1)
+        # Two upserts and one delete, plus the savepoint's SAVEPOINT / RELEASE inside the test's transaction
+        with self.assertNumQueries(5):
+            apply_cart_operations(self.user, [
+                {'op': 'add', 'product_id': self.first.id, 'quantity': 2},
+                {'op': 'set', 'product_id': self.second.id, 'quantity': 5},
+                {'op': 'remove', 'product_id': third.id},
+            ])
+        self.assertEqual(self.quantities(), {self.first.id: 3, self.second.id: 5})
+
+    def test_merge_keeps_the_larger_quantity(self):
+        CartItem.objects.create(user=self.user, product=self.first, quantity=4)
+        merge_cart(self.user, [
+            {'product_id': self.first.id, 'quantity': 2},
+            {'product_id': self.second.id, 'quantity': 3},
+        ])
+        self.assertEqual(self.quantities(), {self.first.id: 4, self.second.id: 3})
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class CartConcurrencyTests(TransactionTestCase):
+    def test_concurrent_adds_are_not_lost(self):
+        user = CustomUser.objects.create_user(email='cart-race@example.com', full_name='Cart Race')
+        product, = create_products(1)
+
+        def add():
+            apply_cart_operations(user, [{'op': 'add', 'product_id': product.id, 'quantity': 1}])
+
+        gave_up = run_concurrently(10, add)
+        quantity = CartItem.objects.get(user=user, product=product).quantity
+        self.assertEqual(quantity, THREADS * 10 - gave_up)
+
+
+# ------------------ INVENTORY ------------------
+
+class StockTests(TestCase):
+    def test_short_line_rolls_back_the_whole_order(self):
+        plenty, scarce = create_products(2, stock=5)
+        Product.objects.filter(id=scarce.id).update(stock=1)
+        with self.assertRaises(InsufficientStock) as caught:
+            decrement_stock({plenty.id: 2, scarce.id: 2})
+        self.assertEqual(caught.exception.product_ids, [scarce.id])
+        stock = dict(Product.objects.values_list('id', 'stock'))
+        self.assertEqual(stock, {plenty.id: 5, scarce.id: 1})
+
+
+class CheckoutStockTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='checkout@example.com', full_name='Checkout')
+        cls.plenty, cls.scarce = create_products(2, stock=5)
+        Product.objects.filter(id=cls.scarce.id).update(stock=1)
+
+    def place_order(self, paid):
+        request = APIRequestFactory().post('/api/orders/create/', {
+            'total_price': '30.00',
+            'is_paid': paid,
+            'items': [
+                {'product': self.plenty.id, 'quantity': 1, 'price': '10.00'},
+                {'product': self.scarce.id, 'quantity': 2, 'price': '10.00'},
+            ],
+        }, format='json')
+        force_authenticate(request, user=self.user)
+        return CreateOrderView.as_view()(request)
+
+    def stock(self):
+        return dict(Product.objects.values_list('id', 'stock'))
+
+    def test_unpaid_order_short_of_stock_is_rejected(self):
+        response = self.place_order(paid=False)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.stock(), {self.plenty.id: 5, self.scarce.id: 1})
+
+    def test_paid_order_short_of_stock_is_kept_and_flagged(self):
+        response = self.place_order(paid=True)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.data['stock_shortfall'])
+        order = Order.objects.get(user=self.user)
+        self.assertTrue(order.stock_shortfall)
+        backordered = dict(order.items.values_list('product_id', 'backordered'))
+        self.assertEqual(backordered, {self.plenty.id: False, self.scarce.id: True})
+        # The line that fit took its stock; the short one took none
+        self.assertEqual(self.stock(), {self.plenty.id: 4, self.scarce.id: 1})
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class StockConcurrencyTests(TransactionTestCase):
+    def test_hot_product_is_never_oversold(self):
+        product, = create_products(1, stock=THREADS * 2)
+        sold = []
+
+        def buy():
+            try:
+                with transaction.atomic():
+                    decrement_stock({product.id: 1})
+                sold.append(1)
+            except InsufficientStock:
+                pass
+
+        # Three purchases per buyer for two units per buyer: exactly the stock sells, the rest is refused
+        self.assertEqual(run_concurrently(3, buy), 0)
+        self.assertEqual(len(sold), THREADS * 2)
+        self.assertEqual(Product.objects.values_list('stock', flat=True).get(id=product.id), 0)
+
+
+# ------------------ READ REPLICA ROUTING ------------------
+
+@override_settings(CACHES=LOCAL_CACHE, REPLICA_STICKY_SECONDS=5)
+@mock.patch('api.db_router.replica_configured', return_value=True)
+class ReplicaRouterTests(TestCase):
+    """Routing decisions only: check_db_router exercises a real replica end to end"""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.router = PrimaryReplicaRouter()
+
+    def routed(self, request, model):
+        @replica_reads
+        def view(request):
+            return self.router.db_for_read(model)
+        return view(request)
+
+    def test_catalog_views_read_the_replica(self, _):
+        self.assertEqual(self.routed(self.factory.get('/', REMOTE_ADDR='10.0.0.1'), Product), REPLICA)
+
+    def test_other_models_and_writes_use_the_primary(self, _):
+        self.assertIsNone(self.routed(self.factory.get('/', REMOTE_ADDR='10.0.0.1'), Order))
+        self.assertIsNone(self.router.db_for_read(Product))
+        self.assertEqual(self.router.db_for_write(Product), 'default')
+
+    def test_writers_stick_to_the_primary(self, _):
+        user = CustomUser.objects.create_user(email='sticky@example.com', full_name='Sticky')
+        write = self.factory.post('/api/cart/', REMOTE_ADDR='10.0.0.2')
+        write.user = user
+        StickyPrimaryMiddleware(lambda request: mock.Mock(status_code=201))(write)
+
+        self.assertIsNone(self.routed(self.factory.get('/', REMOTE_ADDR='10.0.0.2'), Product))
+        # The user's token carries the stickiness to another address; other clients keep the replica
+        token = f'Bearer {RefreshToken.for_user(user).access_token}'
+        self.assertIsNone(self.routed(self.factory.get('/', REMOTE_ADDR='10.0.0.3', HTTP_AUTHORIZATION=token), Product))
+        self.assertEqual(self.routed(self.factory.get('/', REMOTE_ADDR='10.0.0.3'), Product), REPLICA)
+
+    def test_failed_writes_do_not_stick(self, _):
+        write = self.factory.post('/api/cart/', REMOTE_ADDR='10.0.0.4')
+        StickyPrimaryMiddleware(lambda request: mock.Mock(status_code=400))(write)
+        self.assertEqual(self.routed(self.factory.get('/', REMOTE_ADDR='10.0.0.4'), Product), REPLICA)
+
+
+# ------------------ RATE LIMITS ------------------
+
+# The start of a window for every limit below: no previous window to weigh in
+FROZEN_TIME = 1_800_000_000.0
+
+
+@mock.patch('api.ratelimit.time', time=lambda: FROZEN_TIME)
+class RateLimitTests(TestCase):
+    def send(self, ip):
+        check_limits('otp-send', [('victim@example.com', 5, 900), (ip, 2, 3600)])
+
+    def test_rejected_request_uses_up_no_limit(self, _):
+        self.send('10.0.0.1')
+        self.send('10.0.0.1')
+        for _ in range(3):
+            with self.assertRaises(RateLimited):
+                self.send('10.0.0.1')
+        # The attempts the IP limit blocked left the email's quota alone
+        for ip in ('10.0.0.2', '10.0.0.3', '10.0.0.4'):
+            self.send(ip)
+        with self.assertRaises(RateLimited):
+            self.send('10.0.0.5')
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+@mock.patch('api.ratelimit.time', time=lambda: FROZEN_TIME)
+class RateLimitConcurrencyTests(TransactionTestCase):
+    def test_concurrent_hits_never_exceed_the_limit(self, _):
+        allowed = []
+
+        def attempt():
+            try:
+                check_limits('otp-verify', [('race@example.com', 5, 900)])
+                allowed.append(1)
+            except RateLimited:
+                pass
+
+        self.assertEqual(run_concurrently(2, attempt), 0)
+        self.assertEqual(len(allowed), 5)
@@ -2,11 +2,39 @@ from django.contrib import admin
 from django.urls import path , include
 from django.conf import settings
 from django.conf.urls.static import static
-from api.views import generate_invoice  # ✅ import the invoice view
+from api.views import (  # ✅ import the invoice & catalog views
+    generate_invoice, export_invoices, ProductFacetsView, ProductSearchView, ProductSuggestView,
+    CartBatchView, CartMergeView, product_image_rendition, OrderItemsView, sales_analytics,
+)
+from api.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
 
+    # Product image renditions (before the static MEDIA route so misses render lazily)
+    path('media/renditions/products/<int:product_id>/<str:key>/<int:width>.<str:ext>',
+         product_image_rendition, name='product-image-rendition'),
+
+    # Prometheus scrape endpoint
+    path('metrics/', metrics_view, name='metrics'),
+
+    # Catalog facet counts for the product filter sidebar
+    path('api/products/facets/', ProductFacetsView, name='product-facets'),
+
+    # Full-text product search and autocomplete
+    path('api/products/search/', ProductSearchView.as_view(), name='product-search'),
+    path('api/products/suggest/', ProductSuggestView.as_view(), name='product-suggest'),
+
+    # Batched cart updates and local-cart merge at login
+    path('api/cart/batch/', CartBatchView.as_view(), name='cart-batch'),
+    path('api/cart/merge/', CartMergeView.as_view(), name='cart-merge'),
+
+    # Line items of one order, loaded when it is expanded in the order history
+    path('api/orders/<int:order_id>/items/', OrderItemsView.as_view(), name='order-items'),
+
+    # Staff sales analytics from the daily rollups
+    path('api/analytics/sales/', sales_analytics, name='sales-analytics'),
+
     # Your app API routes
     path('api/', include('api.urls')),
 
@@ -19,4 +47,7 @@ urlpatterns = [
     # Invoice generation endpoint
     path('invoice/<int:order_id>/', generate_invoice, name='generate-invoice'),
 
+    # Staff-only bulk invoice export (ZIP)
+    path('invoice/export/', export_invoices, name='export-invoices'),
+
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
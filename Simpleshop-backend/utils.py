@@ -1,7 +1,6 @@
 # api/utils.py
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
-from django.conf import settings
+from .outbox import queue_email
 
 def send_order_confirmation_email(user_email, order):
     subject = 'Your Order Confirmation - Electronics Mart'
@@ -9,10 +8,5 @@ def send_order_confirmation_email(user_email, order):
         'order': order,
         'user': order.user,
     })
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user_email],
-        fail_silently=False,
-    )
+    # Delivered by the send_queued_emails worker, not in the request
+    return queue_email(subject, message, [user_email])
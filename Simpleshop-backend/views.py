@@ -1,13 +1,11 @@
 # Django and third-party imports
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status
-from google.oauth2 import id_token
-from google.auth.transport import requests
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.decorators import api_view, permission_classes
-from .models import CustomUser, Product, UserAddress, Order, OrderItem, PasswordResetOTP , CartItem
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from .models import CustomUser, Product, UserAddress, Order, OrderItem, PasswordResetOTP , CartItem, ProductFacetCount
 from .serializers import (
     RegisterSerializer,
     ProductSerializer,
@@ -15,23 +13,46 @@ from .serializers import (
     UpdatePasswordSerializer,
     OrderItemSerializer,
     OrderSerializer,
+    OrderSummarySerializer,
     UserAddressSerializer,
-    OrderCreateSerializer , CartItemSerializer
+    OrderCreateSerializer , CartItemSerializer,
+    CartOperationSerializer, CartMergeItemSerializer, StockReservationItemSerializer
 )
 from django.contrib.auth import update_session_auth_hash
-import razorpay
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.core.mail import send_mail
+from django.db import transaction
 import random
-from django.http import HttpResponse
-from django.template.loader import get_template
-from xhtml2pdf import pisa
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Value
+from django.db.models import Value, F, Func, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.template.loader import render_to_string  # 📩 Email template rendering
 from .utils import send_order_confirmation_email
+from .outbox import queue_email
+from .invoices import ensure_invoice, invoice_response, invoice_orders, iter_invoice_zip, orders_created_between
+from .pdf_render import InvoiceRenderError
+from .images import EXTENSIONS as IMAGE_EXTENSIONS, ensure_rendition, rendition_key, rendition_response
+from django.views.decorators.http import require_GET
+from .cart import apply_cart_operations, merge_cart, missing_products
+from .inventory import InsufficientStock, reserve_stock, order_lines
+from .payments import GatewayBusy, GatewayUnavailable, get_gateway
+from .google_auth import verify_google_token
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from .filters import filter_products, get_product_sort
+from .pagination import KeysetPagination
+from .product_rows import PRODUCT_COLUMNS, ProductRows, row_position, cart_item_rows, order_item_rows, decimal_string
+from .sales import GROUPS as SALES_GROUPS, sales_report, sales_totals
+from .facets import has_filters, global_facets, filtered_facets
+from .search import search_product_ids, suggest_terms
+from .catalog_cache import catalog_cached
+from .db_router import replica_reads
+from .metrics import log_event
+import logging
+from .ratelimit import RateLimited, check_limits, client_ip
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -45,7 +66,7 @@ class GoogleSignupAPIView(APIView):
             return Response({"error": "Token is required"}, status=400)
 
         try:
-            idinfo = id_token.verify_oauth2_token(token, requests.Request())
+            idinfo = verify_google_token(token)  # cached Google signing keys
             email = idinfo.get("email")
             name = idinfo.get("name", "")
 
@@ -76,7 +97,7 @@ class GoogleLoginAPIView(APIView):
             return Response({"error": "Token is required"}, status=400)
 
         try:
-            idinfo = id_token.verify_oauth2_token(token, requests.Request())
+            idinfo = verify_google_token(token)  # cached Google signing keys
             email = idinfo.get("email")
 
             if not email:
@@ -94,7 +115,7 @@ class GoogleLoginAPIView(APIView):
             })
 
         except ValueError as e:
-            print("Google token error:", str(e))
+            log_event('google_login_failed', level=logging.WARNING, error=str(e))
             return Response({"error": "Invalid token"}, status=400)
 
 # 📝 Register via email/password
@@ -103,31 +124,88 @@ class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [AllowAny]
 
-# 📦 List all products with optional brand/category filter
+# 📦 List products with server-side filters, sorting and keyset pagination
 class ProductListView(APIView):
-    def get(self, request):
-        queryset = Product.objects.all()
-        brand = request.GET.get('brand')
-        category = request.GET.get('category')
-
-        if brand:
-            queryset = queryset.filter(brand__iexact=brand)
+    authentication_classes = []  # public catalog: a cache hit should not look up the user
 
-        if category:
-            queryset = queryset.filter(category__iexact=category)
+    @catalog_cached
+    @replica_reads
+    def get(self, request):
+        try:
+            queryset = filter_products(Product.objects.all(), request.GET)
+            ordering = get_product_sort(request.GET)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
 
-        serializer = ProductSerializer(queryset, many=True)
-        return Response(serializer.data)
+        # Tuples in, dicts out (api/product_rows.py): ProductSerializer's output at a
+        # fraction of the CPU. Image URLs stay site-relative, as before.
+        paginator = KeysetPagination(ordering, position=row_position)
+        page = paginator.paginate_queryset(queryset.values_list(*PRODUCT_COLUMNS), request)
+        return paginator.get_paginated_response(ProductRows().products(page))
 
-# 📊 Returns distinct brand names
+# 📊 Returns brand names from the facet summary table (no DISTINCT scan)
 @api_view(['GET'])
+@authentication_classes([])
 @permission_classes([AllowAny])
+@catalog_cached
+@replica_reads
 def BrandListView(request):
-    brands = Product.objects.values_list('brand', flat=True).distinct()
-    return Response(sorted(list(brands)))
+    brands = ProductFacetCount.objects.filter(facet='brand', count__gt=0).values_list('value', flat=True)
+    return Response(sorted(brands))
+
+# 🧮 Facet counts (brand / category / rating / availability) for the current filters
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@catalog_cached
+@replica_reads
+def ProductFacetsView(request):
+    if not has_filters(request.GET):
+        return Response(global_facets())
+    try:
+        return Response(filtered_facets(request.GET))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+# 🔎 Ranked full-text product search (FTS5), combinable with the catalog filters
+class ProductSearchView(APIView):
+    @replica_reads
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        if not query:
+            return Response({"error": "Query is required"}, status=400)
+
+        try:
+            page_size = max(1, min(int(request.GET.get('page_size', 24)), 100))
+        except ValueError:
+            return Response({"error": "Invalid page_size"}, status=400)
+
+        ranked_ids = search_product_ids(query)
+        try:
+            queryset = filter_products(Product.objects.filter(id__in=ranked_ids), request.GET)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        # Keep the bm25 order from FTS; only the page itself is loaded
+        matching = set(queryset.values_list('id', flat=True))
+        page_ids = [pk for pk in ranked_ids if pk in matching][:page_size]
+        products = Product.objects.in_bulk(page_ids)
+        serializer = ProductSerializer([products[pk] for pk in page_ids], many=True)
+        return Response({"query": query, "results": serializer.data})
+
+# 💡 Typo-tolerant autocomplete suggestions for the search box
+class ProductSuggestView(APIView):
+    @replica_reads
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        return Response({"query": query, "suggestions": suggest_terms(query)})
 
 # 🔍 Fetch details for a specific product
 class ProductDetailView(APIView):
+    authentication_classes = []
+
+    @catalog_cached
+    @replica_reads
     def get(self, request, pk):
         product = get_object_or_404(Product, pk=pk)
         serializer = ProductSerializer(product)
@@ -189,30 +267,72 @@ class CreateOrderView(generics.CreateAPIView):
     serializer_class = OrderCreateSerializer
 
     def create(self, request, *args, **kwargs):
-        print("▶️ Incoming data:", request.data)
+        # 📝 Sampled, and without the address / payment fields of the body
+        log_event(
+            'order_create_request', sample_rate=settings.LOG_EVENT_SAMPLE_RATE,
+            user_id=request.user.id, items=len(request.data.get('items') or []),
+            paid=bool(request.data.get('is_paid')),
+        )
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
-            print("❌ Validation errors:", serializer.errors)
+            log_event('order_create_invalid', level=logging.WARNING, user_id=request.user.id, errors=serializer.errors)
             return Response(serializer.errors, status=400)
 
-        order = serializer.save()
+        # ✅ Order and its confirmation email are committed together
+        with transaction.atomic():
+            order = serializer.save()
+            send_order_confirmation_email(request.user.email, order)
 
-        # ✅ Send order confirmation email
-        send_order_confirmation_email(request.user.email, order)
+        if order.razorpay_order_id:
+            get_gateway().forget_order(order.razorpay_order_id)
 
         return Response(serializer.data, status=201)
 
-# 📦 List user’s past orders
+# 📦 List user’s past orders, newest first, one cursor page at a time.
+# ?view=summary returns just the list row (number, date, total, paid, item count).
 class UserOrdersView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = OrderSerializer
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user).order_by('-created_at')
+        return Order.objects.filter(user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        view = request.query_params.get('view', 'full')
+        if view not in ('full', 'summary'):
+            return Response({"error": "view must be 'full' or 'summary'"}, status=400)
+
+        queryset = self.get_queryset()
+        if view == 'summary':
+            # No items or products: the unit count is a per-order subquery on the page rows
+            units = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values(
+                total=Func(F('quantity'), function='SUM'),
+            )
+            queryset = (
+                queryset.only('id', 'user_order_number', 'created_at', 'total_price', 'is_paid')
+                .annotate(item_count=Coalesce(Subquery(units), 0, output_field=IntegerField()))
+            )
+
+        # (created_at, id) keyset on the (user, created_at) index
+        paginator = KeysetPagination('-created_at')
+        orders = paginator.paginate_queryset(queryset, request)
+        if view == 'summary':
+            return paginator.get_paginated_response(OrderSummarySerializer(orders, many=True).data)
+
+        context = self.get_serializer_context()
+        # Items and their products for this page come in one extra query, as plain tuples
+        context['order_items'] = order_item_rows([order.id for order in orders], request)
+        return paginator.get_paginated_response(OrderSerializer(orders, many=True, context=context).data)
+
+# 🧾 Line items of one order (MyOrders.js loads them when a row is expanded)
+class OrderItemsView(APIView):
+    permission_classes = [IsAuthenticated]
 
-# 💳 Create a Razorpay order from amount
-client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
+    def get(self, request, order_id):
+        get_object_or_404(Order.objects.only('id'), id=order_id, user=request.user)
+        return Response(order_item_rows([order_id], request).get(order_id, []))
 
+# 💳 Create a Razorpay order from amount (idempotent per user + cart)
 class RazorpayOrderCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -230,11 +350,30 @@ class RazorpayOrderCreateView(APIView):
             if amount_in_paise <= 0:
                 return Response({"error": "Amount must be positive"}, status=status.HTTP_400_BAD_REQUEST)
 
-            razorpay_order = client.order.create({
-                "amount": amount_in_paise,
-                "currency": "INR",
-                "payment_capture": 1
-            })
+            # Optional cart lines: their stock is held until the order is placed or the hold expires
+            items = StockReservationItemSerializer(data=request.data.get('items', []), many=True)
+            if not items.is_valid():
+                return Response(items.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                razorpay_order, created = get_gateway().create_order(
+                    request.user, amount_in_paise, items.validated_data
+                )
+            except GatewayBusy as e:
+                return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+            except GatewayUnavailable:
+                response = Response({"error": "Payment gateway unavailable, please retry shortly."},
+                                    status=status.HTTP_503_SERVICE_UNAVAILABLE)
+                response['Retry-After'] = '10'
+                return response
+
+            # A repeated request reuses the gateway order and the stock already held for it
+            if created and items.validated_data:
+                try:
+                    reserve_stock(request.user, order_lines(items.validated_data), razorpay_order['id'])
+                except InsufficientStock as e:
+                    get_gateway().forget_order(razorpay_order['id'])
+                    return Response({"error": str(e), "products": e.product_ids}, status=status.HTTP_409_CONFLICT)
 
             return Response({
                 "order_id": razorpay_order['id'],
@@ -244,9 +383,21 @@ class RazorpayOrderCreateView(APIView):
             })
 
         except Exception as e:
-            print("Razorpay order creation error:", e)
+            log_event('razorpay_order_failed', level=logging.ERROR, user_id=request.user.id, error=str(e))
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def otp_limits(request, email, limits):
+    return [
+        (email.strip().lower(), *limits['email']),
+        (client_ip(request), *limits['ip']),
+    ]
+
+
+def rate_limited_response(e):
+    response = Response({"error": "Too many requests, please try again later"}, status=429)
+    response['Retry-After'] = str(e.retry_after)
+    return response
+
 # ✉️ Send OTP for password reset via email
 class SendOTPView(APIView):
     def post(self, request):
@@ -254,29 +405,31 @@ class SendOTPView(APIView):
         if not email:
             return Response({"error": "Email is required"}, status=400)
 
+        # 🚦 Limited before the user lookup, so unknown emails count too
+        try:
+            check_limits('otp-send', otp_limits(request, email, settings.OTP_SEND_LIMITS))
+        except RateLimited as e:
+            return rate_limited_response(e)
+
         try:
             user = User.objects.get(email=email)
             otp = str(random.randint(100000, 999999))
 
-            PasswordResetOTP.objects.create(user=user, otp=otp)
-
             subject = "Electronics Mart OTP Verification"
             message = (
                 f"Hi,\n\n"
                 f"We received a request to reset your password on Electronics Mart.\n\n"
                 f"Your One-Time Password (OTP) is : {otp}\n\n"
-                f"This OTP is valid for 5 minutes.\n"
+                f"This OTP is valid for {settings.OTP_VALIDITY_MINUTES} minutes.\n"
                 f"If you did not request this, you can safely ignore this email.\n\n"
                 f"Thanks,\n"
                 f"Team Electronics"
             )
 
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[email],
-            )
+            # 📬 OTP row and its email are committed together; the worker sends it
+            with transaction.atomic():
+                PasswordResetOTP.objects.create(user=user, otp=otp)
+                queue_email(subject, message, [email])
 
             return Response({"message": "OTP sent to email"}, status=200)
 
@@ -288,17 +441,27 @@ class VerifyOTPView(APIView):
     def post(self, request):
         email = request.data.get("email")
         otp = request.data.get("otp")
+        if not email or not otp:
+            return Response({"error": "Invalid OTP"}, status=400)
 
+        # 🚦 Six digits are guessable without a cap on attempts
         try:
-            user = User.objects.get(email=email)
-            otp_obj = PasswordResetOTP.objects.filter(user=user, otp=otp, is_used=False).latest("created_at")
+            check_limits('otp-verify', otp_limits(request, email, settings.OTP_VERIFY_LIMITS))
+        except RateLimited as e:
+            return rate_limited_response(e)
 
-            otp_obj.is_used = True
-            otp_obj.save()
+        try:
+            user = User.objects.get(email=email)
+        except User.DoesNotExist:
+            return Response({"error": "Invalid OTP"}, status=400)
 
-            return Response({"message": "OTP verified"}, status=200)
-        except (User.DoesNotExist, PasswordResetOTP.DoesNotExist):
+        # One indexed conditional UPDATE: an OTP can only be used once, even concurrently
+        used = PasswordResetOTP.objects.filter(
+            user=user, otp=otp, is_used=False, expires_at__gt=timezone.now()
+        ).update(is_used=True)
+        if not used:
             return Response({"error": "Invalid OTP"}, status=400)
+        return Response({"message": "OTP verified"}, status=200)
 
 # 🔁 Reset password after OTP verification
 from django.contrib.auth.hashers import make_password
@@ -320,50 +483,108 @@ class ResetPasswordView(APIView):
         except User.DoesNotExist:
             return Response({"error": "User not found"}, status=404)
 
+# 🖼️ Product image rendition; rendered and cached on disk on first request.
+# In production the web server serves existing files from MEDIA_ROOT and only
+# falls back to this view for missing ones.
+@require_GET
+def product_image_rendition(request, product_id, key, width, ext):
+    fmt = IMAGE_EXTENSIONS.get(ext)
+    if fmt is None or width not in settings.IMAGE_RENDITION_WIDTHS:
+        return HttpResponse(status=404)
+    product = Product.objects.filter(id=product_id).only('id', 'image').first()
+    if product is None or not product.image or rendition_key(product.image.name) != key:
+        return HttpResponse(status=404)
+
+    try:
+        path = ensure_rendition(product, width, fmt)
+    except FuturesTimeoutError:
+        response = HttpResponse("Image is being generated, please retry shortly.", status=503)
+        response['Retry-After'] = '2'
+        return response
+    except OSError:  # missing or unreadable original
+        return HttpResponse(status=404)
+    return rendition_response(path, fmt)
+
 # 🧾 Generate PDF invoice for an order
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def generate_invoice(request, order_id):
     try:
-        order = Order.objects.get(id=order_id, user=request.user)
+        order = invoice_orders().get(id=order_id, user=request.user)
     except Order.DoesNotExist:
         return HttpResponse("Order not found or you don't have permission.", status=404)
 
-    template_path = 'invoice.html'
-
-    items = [
-        {
-            "product_name": item.product.name,
-            "quantity": item.quantity,
-            "price": item.price,
-            "subtotal": item.quantity * item.price
-        }
-        for item in order.items.all()
-    ]
-
-    context = {
-        'order': order,
-        'items': items
-    }
-
-    template = get_template(template_path)
-    html = template.render(context)
-
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="invoice_order_{order.id}.pdf"'
-
-    pisa_status = pisa.CreatePDF(html, dest=response)
-    if pisa_status.err:
-        return HttpResponse('We had some errors <pre>' + html + '</pre>')
+    # Served from disk when already rendered; misses render in the process pool
+    try:
+        path = ensure_invoice(order)
+    except FuturesTimeoutError:
+        response = HttpResponse("Invoice is being generated, please retry shortly.", status=503)
+        response['Retry-After'] = '5'
+        return response
+    except InvoiceRenderError:
+        return HttpResponse('We had some errors generating the invoice.', status=500)
+    return invoice_response(order, path)
+
+# 🗜️ Staff-only bulk invoice export, streamed as a ZIP
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_invoices(request):
+    orders = invoice_orders()
+    ids = request.GET.get('ids')
+    start = request.GET.get('start')
+    end = request.GET.get('end')
+
+    if ids:
+        try:
+            orders = orders.filter(id__in=[int(pk) for pk in ids.split(',') if pk.strip()]).order_by('id')
+        except ValueError:
+            return Response({"error": "ids must be a comma separated list of order ids"}, status=400)
+    elif start and end:
+        start_date, end_date = parse_date(start), parse_date(end)
+        if not start_date or not end_date:
+            return Response({"error": "start and end must be YYYY-MM-DD dates"}, status=400)
+        orders = orders_created_between(orders, start_date, end_date)
+    else:
+        return Response({"error": "Pass either ids or a start and end date"}, status=400)
+
+    response = StreamingHttpResponse(iter_invoice_zip(orders), content_type='application/zip')
+    response['Content-Disposition'] = 'attachment; filename="invoices.zip"'
     return response
 
+# 📈 Staff sales analytics: units, revenue and orders over a date range, answered
+# from the daily rollups instead of scanning order lines
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def sales_analytics(request):
+    try:
+        start_date = parse_date(request.GET.get('start', ''))
+        end_date = parse_date(request.GET.get('end', ''))
+    except ValueError:
+        start_date = end_date = None
+    if not start_date or not end_date or start_date > end_date:
+        return Response({"error": "start and end must be YYYY-MM-DD dates, start first"}, status=400)
+
+    by = [field.strip() for field in request.GET.get('by', 'day').split(',') if field.strip()]
+    if not by or len(set(by)) != len(by) or not set(by) <= set(SALES_GROUPS):
+        return Response({"error": f"by must be a comma separated list of {', '.join(SALES_GROUPS)}"}, status=400)
+
+    category = request.GET.get('category') or None
+    brand = request.GET.get('brand') or None
+    totals = sales_totals(start_date, end_date, category, brand)
+    rows = sales_report(start_date, end_date, by, category, brand)
+    return Response({
+        "start": start_date,
+        "end": end_date,
+        "by": by,
+        "totals": {**totals, "revenue": decimal_string(totals['revenue'])},
+        "rows": [{**row, "revenue": decimal_string(row['revenue'])} for row in rows],
+    })
+
 class CartView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        cart_items = CartItem.objects.filter(user=request.user)
-        serializer = CartItemSerializer(cart_items, many=True)
-        return Response(serializer.data)
+        return Response(cart_item_rows(request.user))
 
     def post(self, request):
         serializer = CartItemSerializer(data=request.data)
@@ -371,13 +592,9 @@ class CartView(APIView):
             product = serializer.validated_data['product']
             quantity = serializer.validated_data['quantity']
 
-            cart_item, created = CartItem.objects.get_or_create(
-                user=request.user, product=product,
-                defaults={'quantity': quantity}
-            )
-            if not created:
-                cart_item.quantity += quantity
-                cart_item.save()
+            # Atomic upsert: concurrent adds of the same product can't lose an increment
+            apply_cart_operations(request.user, [{'op': 'add', 'product_id': product.id, 'quantity': quantity}])
+            cart_item = CartItem.objects.select_related('product').get(user=request.user, product=product)
 
             return Response(CartItemSerializer(cart_item).data, status=201)
         return Response(serializer.errors, status=400)
@@ -389,3 +606,38 @@ class CartView(APIView):
 
         CartItem.objects.filter(user=request.user, product_id=product_id).delete()
         return Response({"message": "Item removed"}, status=204)
+
+# 🧺 Apply many add/set/remove cart operations in one transaction
+class CartBatchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = CartOperationSerializer(data=request.data.get('operations', []), many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+
+        operations = serializer.validated_data
+        missing = missing_products(op['product_id'] for op in operations if op['op'] != 'remove')
+        if missing:
+            return Response({"error": f"Products not found: {missing}"}, status=400)
+
+        apply_cart_operations(request.user, operations)
+        cart_items = CartItem.objects.filter(user=request.user).select_related('product')
+        return Response(CartItemSerializer(cart_items, many=True).data)
+
+# 🔀 Merge the browser's local cart into the server cart at login
+class CartMergeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = CartMergeItemSerializer(data=request.data.get('items', []), many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+
+        items = serializer.validated_data
+        # Products deleted since the local cart was saved are dropped, not an error
+        missing = set(missing_products(item['product_id'] for item in items))
+        merge_cart(request.user, [item for item in items if item['product_id'] not in missing])
+
+        cart_items = CartItem.objects.filter(user=request.user).select_related('product')
+        return Response(CartItemSerializer(cart_items, many=True).data)
@@ -1,5 +1,26 @@
 // src/context/CartContext.js
 import React, { createContext, useState, useEffect } from "react";
+import axios from "axios";
+
+const CART_API = "http://localhost:8000/api/cart";
+
+const authHeaders = () => {
+  const token = localStorage.getItem("access_token");
+  return token ? { Authorization: `Bearer ${token}` } : null;
+};
+
+// Server cart rows ({ product, quantity }) -> local cart items ({ ...product, quantity })
+const fromServerCart = (items) =>
+  items.map((item) => ({ ...item.product, quantity: item.quantity }));
+
+// Send cart changes to the server when logged in (fire-and-forget)
+const syncOperations = (operations) => {
+  const headers = authHeaders();
+  if (!headers) return;
+  axios
+    .post(`${CART_API}/batch/`, { operations }, { headers })
+    .catch((err) => console.error("Cart sync failed :", err));
+};
 
 // Create the cart context
 export const CartContext = createContext();
@@ -7,12 +28,23 @@ export const CartContext = createContext();
 export const CartProvider = ({ children }) => {
   const [cartItems, setCartItems] = useState([]);
 
-  // Load cart items from localStorage on first render
+  // Load cart items from localStorage on first render, then merge them into
+  // the server cart in a single call if the user is logged in
   useEffect(() => {
     const storedCart = localStorage.getItem("cart");
-    if (storedCart) {
-      setCartItems(JSON.parse(storedCart));
-    }
+    const localItems = storedCart ? JSON.parse(storedCart) : [];
+    setCartItems(localItems);
+
+    const headers = authHeaders();
+    if (!headers) return;
+    axios
+      .post(
+        `${CART_API}/merge/`,
+        { items: localItems.map((item) => ({ product_id: item.id, quantity: item.quantity })) },
+        { headers }
+      )
+      .then((res) => setCartItems(fromServerCart(res.data)))
+      .catch((err) => console.error("Cart merge failed :", err));
   }, []);
 
   // Save cart items to localStorage whenever they change
@@ -22,6 +54,7 @@ export const CartProvider = ({ children }) => {
 
   // Add a product to the cart
   const addToCart = (product) => {
+    syncOperations([{ op: "add", product_id: product.id, quantity: 1 }]);
     setCartItems((prevItems) => {
       const existingItem = prevItems.find((item) => item.id === product.id);
       if (existingItem) {
@@ -39,6 +72,11 @@ export const CartProvider = ({ children }) => {
 
   // Update product quantity (increment or decrement)
   const updateQuantity = (id, change) => {
+    const item = cartItems.find((i) => i.id === id);
+    if (item) {
+      const quantity = Math.max(item.quantity + change, 0);
+      syncOperations([{ op: "set", product_id: id, quantity }]);
+    }
     setCartItems((prevItems) =>
       prevItems
         .map((item) =>
@@ -52,6 +90,7 @@ export const CartProvider = ({ children }) => {
 
   // Remove product from cart entirely
   const removeFromCart = (id) => {
+    syncOperations([{ op: "remove", product_id: id }]);
     setCartItems((items) => items.filter((item) => item.id !== id));
   };
 
@@ -1,38 +1,49 @@
 import React, { useEffect, useState } from 'react';
 import './MyOrders.css';
 
+// Summary rows only (number, date, total, status, item count), a page at a time;
+// line items are fetched per order when the row is expanded
+const ORDERS_URL = 'http://localhost:8000/api/orders/?view=summary';
+
 const MyOrders = () => {
   const [orders, setOrders] = useState([]);
+  const [nextUrl, setNextUrl] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
+  const [expanded, setExpanded] = useState({});
+  const [itemsByOrder, setItemsByOrder] = useState({});
+
+  const fetchOrders = async (url) => {
+    const token = localStorage.getItem('access_token');
+    if (!token) {
+      throw new Error('User not authenticated. Please login.');
+    }
+
+    const response = await fetch(url, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+        Authorization: `Bearer ${token}`,
+      },
+    });
+
+    if (!response.ok) {
+      const errData = await response.json();
+      throw new Error(errData.detail || errData.error || 'Failed to fetch orders');
+    }
+
+    const data = await response.json();
+    setOrders((previous) => (url === ORDERS_URL ? data.results : [...previous, ...data.results]));
+    setNextUrl(data.next);
+  };
 
   useEffect(() => {
-    const fetchOrders = async () => {
+    const fetchFirstPage = async () => {
       setLoading(true);
       setError(null);
       try {
-        const token = localStorage.getItem('access_token');
-        if (!token) {
-          setError('User not authenticated. Please login.');
-          setLoading(false);
-          return;
-        }
-
-        const response = await fetch('http://localhost:8000/api/orders/', {
-          method: 'GET',
-          headers: {
-            'Content-Type': 'application/json',
-            Authorization: `Bearer ${token}`,
-          },
-        });
-
-        if (!response.ok) {
-          const errData = await response.json();
-          throw new Error(errData.detail || 'Failed to fetch orders');
-        }
-
-        const data = await response.json();
-        setOrders(data);
+        await fetchOrders(ORDERS_URL);
       } catch (err) {
         setError(err.message);
       } finally {
@@ -40,9 +51,49 @@ const MyOrders = () => {
       }
     };
 
-    fetchOrders();
+    fetchFirstPage();
   }, []);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      await fetchOrders(nextUrl);
+    } catch (err) {
+      setError(err.message);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const toggleItems = async (orderId) => {
+    const isOpen = !expanded[orderId];
+    setExpanded((previous) => ({ ...previous, [orderId]: isOpen }));
+    if (!isOpen || itemsByOrder[orderId]) {
+      return;
+    }
+
+    try {
+      const token = localStorage.getItem('access_token');
+      const response = await fetch(`http://localhost:8000/api/orders/${orderId}/items/`, {
+        method: 'GET',
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+      });
+
+      if (!response.ok) {
+        throw new Error('Failed to load items');
+      }
+
+      const items = await response.json();
+      setItemsByOrder((previous) => ({ ...previous, [orderId]: items }));
+    } catch (err) {
+      console.error('Order items error :', err);
+      setExpanded((previous) => ({ ...previous, [orderId]: false }));
+      alert('Could not load the items of this order. Please try again.');
+    }
+  };
+
   const downloadInvoice = async (orderId) => {
     try {
       const token = localStorage.getItem('access_token');
@@ -86,7 +137,7 @@ const MyOrders = () => {
           <table className="orders-table">
             <thead>
               <tr>
-                <th>Order ID</th>
+                <th>Order</th>
                 <th>Products</th>
                 <th>Total (₹)</th>
                 <th>Status</th>
@@ -97,19 +148,28 @@ const MyOrders = () => {
             <tbody>
               {orders.map((order) => (
                 <tr key={order.id}>
-                  <td data-label="Order ID">{order.id}</td>
+                  <td data-label="Order">#{order.user_order_number || order.id}</td>
                   <td data-label="Products" className="product-list-cell">
-                    {order.items && order.items.length > 0 ? (
+                    {order.item_count > 0 ? (
+                      <button className="items-btn" onClick={() => toggleItems(order.id)}>
+                        {order.item_count} {order.item_count === 1 ? 'item' : 'items'}{' '}
+                        {expanded[order.id] ? '▲' : '▼'}
+                      </button>
+                    ) : (
+                      <span>No items</span>
+                    )}
+                    {expanded[order.id] && !itemsByOrder[order.id] && (
+                      <p className="items-loading">Loading items...</p>
+                    )}
+                    {expanded[order.id] && itemsByOrder[order.id] && (
                       <ul className="product-list">
-                        {order.items.map((item, idx) => (
+                        {itemsByOrder[order.id].map((item, idx) => (
                           <li key={idx}>
                             <span className="product-name">{item.product.name}</span> ×{' '}
                             <span className="product-qty">{item.quantity}</span>
                           </li>
                         ))}
                       </ul>
-                    ) : (
-                      <span>No items</span>
                     )}
                   </td>
                   <td data-label="Total">₹{order.total_price}</td>
@@ -129,6 +189,11 @@ const MyOrders = () => {
               ))}
             </tbody>
           </table>
+          {nextUrl && (
+            <button className="load-more-btn" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : 'Load more orders'}
+            </button>
+          )}
         </div>
       )}
     </div>
@@ -47,6 +47,7 @@ const Payment = () => {
 
     try {
       const amountInPaise = Math.round(amount * 100);
+      const cartItems = JSON.parse(localStorage.getItem("itemsToDisplay")) || [];
 
       const orderResponse = await fetch("http://localhost:8000/api/razorpay/create-order/", {
         method: "POST",
@@ -54,9 +55,26 @@ const Payment = () => {
           "Content-Type": "application/json",
           Authorization: `Bearer ${localStorage.getItem("access_token")}`,
         },
-        body: JSON.stringify({ amount: amountInPaise }),
+        // Items are sent so their stock is held while the customer pays
+        body: JSON.stringify({
+          amount: amountInPaise,
+          items: cartItems.map((item) => ({ product: item.id, quantity: item.quantity })),
+        }),
       });
 
+      if (orderResponse.status === 409) {
+        Swal.fire({
+          title: "Out of Stock",
+          text: "Some items in your cart are no longer available in the requested quantity.",
+          icon: "error",
+          background: "#1e1e2d",
+          color: "#fff",
+          confirmButtonColor: "#6c5ce7"
+        });
+        setLoading(false);
+        return;
+      }
+
       if (!orderResponse.ok) {
         Swal.fire({
           title: "Order Error",
@@ -123,10 +141,13 @@ const Payment = () => {
             });
 
             if (!res.ok) throw new Error("Failed to save order");
+            const savedOrder = await res.json();
 
             Swal.fire({
               title: "🎉 Payment Successful !",
-              text: `Your payment ID : ${response.razorpay_payment_id}`,
+              text: savedOrder.stock_shortfall
+                ? `Your payment ID : ${response.razorpay_payment_id}. Some items sold out while you paid; we'll refund them or ship them once they're back in stock.`
+                : `Your payment ID : ${response.razorpay_payment_id}`,
               icon: "success",
               background: "#1e1e2d",
               color: "#fff",
@@ -5,9 +5,16 @@ import { CartContext } from '../context/CartContext';
 import { WishlistContext } from '../context/WishlistContext';
 import { useNavigate, useLocation } from 'react-router-dom';
 
+// Rendition URLs are site-relative, like product.image
+const withHost = (srcset) =>
+  srcset.split(', ').map((entry) => (entry.startsWith('/') ? `http://localhost:8000${entry}` : entry)).join(', ');
+
+const GRID_IMAGE_SIZES = '(max-width: 600px) 50vw, 320px';
+
 const Products = () => {
-  const [products, setProducts] = useState([]);
   const [filteredProducts, setFilteredProducts] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [facets, setFacets] = useState({});
   const [viewImage, setViewImage] = useState(null);
   const [categories, setCategories] = useState([]);
   const [brands, setBrands] = useState([]);
@@ -54,52 +61,78 @@ const Products = () => {
     }
   };
 
-  useEffect(() => {
-    axios.get('http://localhost:8000/api/products/')
-      .then((res) => {
-        setProducts(res.data);
-        const cats = [...new Set(res.data.map((p) => p.category))];
-        const brnds = [...new Set(res.data.map((p) => p.brand))];
-        setCategories(cats);
-        setBrands(brnds);
-      })
-      .catch((err) => console.error('Error fetching products :', err));
-  }, []);
-
-  useEffect(() => {
-    let result = products;
+  // The backend ORs repeated category params, so narrow here: the URL category
+  // ANDs with the sidebar selection, as the old client-side filter did.
+  // null when the two exclude each other and nothing can match.
+  const activeCategories = () => {
     const categoryFromURL = getCategoryQuery();
+    if (!categoryFromURL) return selectedCategories;
+    if (!selectedCategories.length) return [categoryFromURL];
+    const matching = selectedCategories.filter((c) => c.toLowerCase() === categoryFromURL.toLowerCase());
+    return matching.length ? matching : null;
+  };
 
-    if (categoryFromURL) {
-      result = result.filter(p => p.category?.toLowerCase() === categoryFromURL.toLowerCase());
-    }
+  // Build the server-side filter query from the sidebar state
+  const buildQuery = (cursor) => {
+    const params = new URLSearchParams();
+
+    (activeCategories() || []).forEach((c) => params.append('category', c));
+    selectedBrands.forEach((b) => params.append('brand', b));
 
-    if (selectedCategories.length) {
-      result = result.filter(p => selectedCategories.includes(p.category));
+    if (selectedRatings.length) {
+      params.append('min_rating', Math.min(...selectedRatings));
     }
 
-    if (selectedBrands.length) {
-      result = result.filter(p => selectedBrands.includes(p.brand));
+    if (selectedAvailability.length === 1) {
+      params.append('in_stock', selectedAvailability[0] === 'in' ? 'true' : 'false');
     }
 
-    if (selectedRatings.length) {
-      result = result.filter(p => selectedRatings.some(r => Math.floor(p.rating) >= r));
+    if (price < 100000) {
+      params.append('max_price', price);
     }
 
-    if (selectedAvailability.length) {
-      result = result.filter(p => {
-        if (selectedAvailability.includes("in") && p.stock > 0) return true;
-        if (selectedAvailability.includes("out") && p.stock === 0) return true;
-        return false;
-      });
+    if (cursor) {
+      params.append('cursor', cursor);
     }
+    return params;
+  };
 
-    if (price < 100000) {
-      result = result.filter(p => p.price <= price);
+  const countLabel = (facet, value) => {
+    const count = facets[facet]?.[value];
+    return count ? ` (${count})` : '';
+  };
+
+  useEffect(() => {
+    if (activeCategories() === null) {
+      setFilteredProducts([]);
+      setNextCursor(null);
+    } else {
+      axios.get('http://localhost:8000/api/products/', { params: buildQuery() })
+        .then((res) => {
+          setFilteredProducts(res.data.results);
+          setNextCursor(res.data.next ? new URL(res.data.next).searchParams.get('cursor') : null);
+        })
+        .catch((err) => console.error('Error fetching products :', err));
     }
 
-    setFilteredProducts(result);
-  }, [products, selectedCategories, selectedBrands, selectedRatings, selectedAvailability, price, location.search]);
+    // Counts for the sidebar come from the facets endpoint, not the product page
+    axios.get('http://localhost:8000/api/products/facets/', { params: buildQuery() })
+      .then((res) => {
+        setFacets(res.data);
+        setCategories((prev) => [...new Set([...prev, ...Object.keys(res.data.category)])]);
+        setBrands((prev) => [...new Set([...prev, ...Object.keys(res.data.brand)])].sort());
+      })
+      .catch((err) => console.error('Error fetching facets :', err));
+  }, [selectedCategories, selectedBrands, selectedRatings, selectedAvailability, price, location.search]);
+
+  const loadMore = () => {
+    axios.get('http://localhost:8000/api/products/', { params: buildQuery(nextCursor) })
+      .then((res) => {
+        setFilteredProducts((prev) => [...prev, ...res.data.results]);
+        setNextCursor(res.data.next ? new URL(res.data.next).searchParams.get('cursor') : null);
+      })
+      .catch((err) => console.error('Error fetching products :', err));
+  };
 
   useEffect(() => {
     const handleClickOutside = (event) => {
@@ -183,7 +216,7 @@ const Products = () => {
                   checked={selectedCategories.includes(cat)}
                   onChange={() => toggleSelection(selectedCategories, setSelectedCategories, cat)}
                 />
-                <span>{cat}</span>
+                <span>{cat}{countLabel('category', cat)}</span>
               </div>
             ))}
           </div>
@@ -226,7 +259,7 @@ const Products = () => {
                         toggleSelection(selectedBrands, setSelectedBrands, brand)
                       }
                     />
-                    {brand}
+                    {brand}{countLabel('brand', brand)}
                   </label>
                 ))}
             </div>
@@ -271,7 +304,7 @@ const Products = () => {
                 checked={selectedAvailability.includes("in")}
                 onChange={() => toggleSelection(selectedAvailability, setSelectedAvailability, "in")}
               />
-              <span>In Stock</span>
+              <span>In Stock{countLabel('availability', 'in_stock')}</span>
             </div>
             <div>
               <input
@@ -280,7 +313,7 @@ const Products = () => {
                 checked={selectedAvailability.includes("out")}
                 onChange={() => toggleSelection(selectedAvailability, setSelectedAvailability, "out")}
               />
-              <span>Out of Stock</span>
+              <span>Out of Stock{countLabel('availability', 'out_of_stock')}</span>
             </div>
           </div>
 
@@ -323,12 +356,25 @@ const Products = () => {
                 <div className="wishlist-btn" onClick={() => toggleWishlist(product)}>
                   {isWishlisted(product.id) ? '❤️' : '🤍'}
                 </div>
-                <img
-                  src={`http://localhost:8000${product.image}`}
-                  alt={product.name}
-                  className="product-image"
-                  onClick={() => setViewImage(`http://localhost:8000${product.image}`)}
-                />
+                {/* Resized WebP with JPEG fallback; the browser picks the width it needs */}
+                <picture>
+                  {product.image_renditions && (
+                    <source
+                      type="image/webp"
+                      srcSet={withHost(product.image_renditions.webp.srcset)}
+                      sizes={GRID_IMAGE_SIZES}
+                    />
+                  )}
+                  <img
+                    src={`http://localhost:8000${product.image}`}
+                    srcSet={product.image_renditions ? withHost(product.image_renditions.jpeg.srcset) : undefined}
+                    sizes={GRID_IMAGE_SIZES}
+                    loading="lazy"
+                    alt={product.name}
+                    className="product-image"
+                    onClick={() => setViewImage(`http://localhost:8000${product.image}`)}
+                  />
+                </picture>
                 <div className="product-info">
                   <h3>{product.name}</h3>
                   <p className="description">{product.description}</p>
@@ -362,6 +408,12 @@ const Products = () => {
             ))
           )}
         </div>
+
+        {nextCursor && (
+          <button className="clear-filters-btn" onClick={loadMore}>
+            Load More
+          </button>
+        )}
       </div>
     </div>
   );